@@ -29,6 +29,7 @@ Example:
     )
 """
 
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional
@@ -56,15 +57,95 @@ class AgentMemory:
         if db_path is None:
             db_path = str(Path.home() / ".engram" / "memory.db")
         
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.storage = SQLiteBackend(db_path)
-        self.storage.initialize()
-        self.traverser = MemoryTraverser(self.storage)
+        # Storage and traverser are created on first use
+        self._db_path = db_path
+        self._storage: Optional[SQLiteBackend] = None
+        self._traverser: Optional[MemoryTraverser] = None
         self._last_task_id: Optional[UUID] = None
+        
+        # Pending writes while inside batch(); None when not batching
+        self._pending_nodes: Optional[list[MemoryNode]] = None
+        self._pending_edges: Optional[list[Edge]] = None
+        self._batch_now: Optional[datetime] = None
+    
+    @property
+    def storage(self) -> SQLiteBackend:
+        """Storage backend, opened and initialized on first access."""
+        if self._storage is None:
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            storage = SQLiteBackend(self._db_path)
+            storage.initialize()
+            self._storage = storage
+        return self._storage
+    
+    @property
+    def traverser(self) -> MemoryTraverser:
+        """Graph traverser, created on first access."""
+        if self._traverser is None:
+            self._traverser = MemoryTraverser(self.storage)
+        return self._traverser
     
     def close(self):
         """Close the database connection."""
-        self.storage.close()
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+            self._traverser = None
+    
+    @contextmanager
+    def batch(self):
+        """Buffer log_* writes and flush them in a single transaction on exit.
+        
+        Nodes logged inside the batch aren't visible to queries until it exits
+        and share a single timestamp taken when the batch opened. If the block
+        raises, buffered writes are discarded.
+        
+        Example:
+            with memory.batch():
+                for item in work:
+                    memory.log_task(what=item)
+        """
+        if self._pending_nodes is not None:
+            # Nested batch - the outermost one flushes
+            yield self
+            return
+        
+        last_task_id = self._last_task_id
+        self._pending_nodes, self._pending_edges = [], []
+        self._batch_now = datetime.now(timezone.utc).replace(tzinfo=None)
+        try:
+            yield self
+            nodes, edges = self._pending_nodes, self._pending_edges
+        except BaseException:
+            # Don't auto-link later logs to a task that was never written
+            self._last_task_id = last_task_id
+            raise
+        finally:
+            self._pending_nodes = self._pending_edges = None
+            self._batch_now = None
+        
+        self.storage.begin_batch()
+        try:
+            self.storage.add_nodes(nodes)
+            self.storage.add_edges(edges)
+        except Exception:
+            self.storage.end_batch(rollback=True)
+            raise
+        self.storage.end_batch()
+    
+    def _now(self) -> datetime:
+        """Current naive UTC time, fixed for the duration of a batch."""
+        return self._batch_now or datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    def _write(self, node: MemoryNode, edges: Optional[list[Edge]] = None) -> UUID:
+        """Store a node and its edges together, or buffer them inside a batch."""
+        if self._pending_nodes is not None:
+            self._pending_nodes.append(node)
+            self._pending_edges.extend(edges or [])
+            return node.id
+        if edges:
+            return self.storage.add_node_with_edges(node, edges)
+        return self.storage.add_node(node)
     
     def __enter__(self):
         return self
@@ -97,53 +178,35 @@ class AgentMemory:
         since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
         
         # Get recent memories
-        if tags:
-            recent = self.storage.query_by_tags(tags, limit=limit)
-            # Filter by time
-            recent = [n for n in recent if n.when and n.when >= since]
-        else:
-            recent = self.storage.query_by_time(since=since, limit=limit)
+        recent = self.storage.query_nodes(tags=tags, since=since, limit=limit)
         
-        if not recent:
-            return []
+        # Already newest-first and limited by SQL - nothing to expand
+        if not recent or max_hops <= 0:
+            return recent
         
-        # Expand context via graph traversal
-        context_ids = set()
-        for node in recent:
-            context_ids.add(node.id)
-            if max_hops > 0:
-                related = self.traverser.traverse_bfs(
-                    node.id, max_hops=max_hops, include_start=False
-                )
-                # traverse_bfs returns QueryResult objects
-                context_ids.update(r.node.id for r in related)
+        # Without a tag filter, a full page of recent nodes is already the
+        # newest `limit` nodes overall: anything reached by traversal is older
+        # and would be cut by the final limit anyway
+        if not tags and len(recent) >= limit:
+            return recent
         
-        # Fetch all nodes
-        context = []
-        for node_id in context_ids:
-            node = self.storage.get_node(node_id)
-            if node:
-                context.append(node)
+        # Expand context via a single multi-source traversal from all recent
+        # nodes, keeping recency order for the seeds then BFS order after them
+        context_ids = dict.fromkeys(node.id for node in recent)
+        context_ids.update(dict.fromkeys(self.traverser.traverse_bfs_ids(
+            context_ids, max_hops=max_hops
+        )))
         
-        # Sort by recency
-        context.sort(key=lambda n: n.when or datetime.min, reverse=True)
-        return context[:limit]
+        # Fetch the most recent nodes in one batch; SQLite does the ordering
+        return list(self.storage.get_nodes(context_ids, limit=limit).values())
     
     def get_recent_tasks(self, limit: int = 10) -> list[MemoryNode]:
         """Get recent task completions."""
-        all_recent = self.storage.query_by_time(limit=100)
-        tasks = [n for n in all_recent if n.type == NodeType.TASK]
-        return tasks[:limit]
+        return self.storage.query_nodes(node_type=NodeType.TASK, limit=limit)
     
     def get_insights(self, tags: Optional[list[str]] = None, limit: int = 20) -> list[MemoryNode]:
         """Get stored insights/lessons learned."""
-        if tags:
-            all_nodes = self.storage.query_by_tags(tags, limit=100)
-        else:
-            all_nodes = self.storage.query_by_time(limit=100)
-        
-        insights = [n for n in all_nodes if n.type == NodeType.INSIGHT]
-        return insights[:limit]
+        return self.storage.query_nodes(node_type=NodeType.INSIGHT, tags=tags, limit=limit)
     
     # =========================================================================
     # Memory Logging
@@ -174,25 +237,24 @@ class AgentMemory:
         node = MemoryNode(
             type=NodeType.TASK,
             what=what,
-            when=datetime.now(timezone.utc).replace(tzinfo=None),
+            when=self._now(),
             tags=tags or [],
             artifacts=artifacts or [],
             how=how,
             why=why,
         )
         
-        node_id = self.storage.add_node(node)
-        self._last_task_id = node_id
-        
         # Link to previous context if provided
+        edges = []
         if link_to:
-            edge = Edge(
+            edges.append(Edge(
                 source_id=link_to,
-                target_id=node_id,
+                target_id=node.id,
                 type=EdgeType.LED_TO,
-            )
-            self.storage.add_edge(edge)
+            ))
         
+        node_id = self._write(node, edges)
+        self._last_task_id = node_id
         return node_id
     
     def log_insight(
@@ -220,26 +282,24 @@ class AgentMemory:
         node = MemoryNode(
             type=NodeType.INSIGHT,
             what=what,
-            when=datetime.now(timezone.utc).replace(tzinfo=None),
+            when=self._now(),
             tags=tags or [],
             why=why,
             how=how,
             confidence=confidence,
         )
         
-        node_id = self.storage.add_node(node)
-        
         # Link to source if provided
+        edges = []
         source = link_to or self._last_task_id
         if source:
-            edge = Edge(
+            edges.append(Edge(
                 source_id=source,
-                target_id=node_id,
+                target_id=node.id,
                 type=EdgeType.LED_TO,
-            )
-            self.storage.add_edge(edge)
+            ))
         
-        return node_id
+        return self._write(node, edges)
     
     def log_decision(
         self,
@@ -268,25 +328,23 @@ class AgentMemory:
         node = MemoryNode(
             type=NodeType.DECISION,
             what=what,
-            when=datetime.now(timezone.utc).replace(tzinfo=None),
+            when=self._now(),
             why=why,
             how=how,
             tags=tags or [],
         )
         
-        node_id = self.storage.add_node(node)
-        
         # Link to cause if provided
+        edges = []
         source = link_to or self._last_task_id
         if source:
-            edge = Edge(
+            edges.append(Edge(
                 source_id=source,
-                target_id=node_id,
+                target_id=node.id,
                 type=EdgeType.CAUSED_BY,
-            )
-            self.storage.add_edge(edge)
+            ))
         
-        return node_id
+        return self._write(node, edges)
     
     def log_event(
         self,
@@ -309,13 +367,13 @@ class AgentMemory:
         node = MemoryNode(
             type=NodeType.EVENT,
             what=what,
-            when=datetime.now(timezone.utc).replace(tzinfo=None),
+            when=self._now(),
             who=who or [],
             where=where,
             tags=tags or [],
         )
         
-        return self.storage.add_node(node)
+        return self._write(node)
     
     # =========================================================================
     # Graph Queries
@@ -336,7 +394,7 @@ class AgentMemory:
         to_id: UUID,
     ) -> Optional[list[MemoryNode]]:
         """Find connection path between two memories."""
-        return self.traverser.find_path(from_id, to_id)
+        return self.traverser.find_path_bidir(from_id, to_id)
     
     def search(
         self,
@@ -11,22 +11,23 @@ Usage:
     engram list --limit 10
 """
 
+import functools
+import importlib.util
 import json
 import re
 import sys
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
-from dateutil import parser as dateutil_parser
-
+# rich and dateutil are imported where they are used: together they are
+# most of the CLI's import time, and many commands never need dateutil.
 try:
     import click
-    from rich.console import Console
-    from rich.table import Table
-    from rich.tree import Tree
-    from rich.panel import Panel
+    if importlib.util.find_spec("rich") is None:
+        raise ImportError("rich")
 except ImportError:
     print("CLI dependencies not installed. Run: pip install click rich")
     sys.exit(1)
@@ -42,12 +43,61 @@ from engram.core import (
 from engram.query import MemoryTraverser
 
 
+@functools.cache
+def _get_console():
+    from rich.console import Console
+    return Console()
+
+
+class _LazyConsole:
+    """Forwards to the shared rich Console, creating it on first use."""
+    
+    def __getattr__(self, name):
+        return getattr(_get_console(), name)
+
+
 # Global console for rich output
-console = Console()
+console = _LazyConsole()
 
 # Default database path
 DEFAULT_DB = Path.home() / ".engram" / "memory.db"
 
+# Nodes per write when exporting markdown
+_EXPORT_WRITE_BATCH = 1000
+
+# Enum members by value, for turning click option strings into enums
+_NODE_TYPES = {t.value: t for t in NodeType}
+_EDGE_TYPES = {t.value: t for t in EdgeType}
+_SCOPES = {s.value: s for s in KnowledgeScope}
+
+# Patterns used on every --when/--since/--until and import
+_TODAY_RE = re.compile(r'^today\s+(.+)$')
+_YESTERDAY_RE = re.compile(r'^yesterday\s+(.+)$')
+_MD_SECTION_RE = re.compile(r'^## ', re.MULTILINE)
+_WORD_RE = re.compile(r'\w+')
+
+# import-md header keywords, in priority order: the first listed keyword found
+# anywhere in the header (as a substring) decides the node type
+_HEADER_TYPE_KEYWORDS = {
+    'lesson': NodeType.INSIGHT,
+    'learned': NodeType.INSIGHT,
+    'insight': NodeType.INSIGHT,
+    'decision': NodeType.DECISION,
+    'chose': NodeType.DECISION,
+    'decided': NodeType.DECISION,
+    'todo': NodeType.TASK,
+    'task': NodeType.TASK,
+    'action': NodeType.TASK,
+    'project': NodeType.PROJECT,
+    'module': NodeType.PROJECT,
+    'feature': NodeType.PROJECT,
+    'person': NodeType.PERSON,
+    'who': NodeType.PERSON,
+    'contact': NodeType.PERSON,
+}
+_HEADER_TYPE_RANK = {keyword: rank for rank, keyword in enumerate(_HEADER_TYPE_KEYWORDS)}
+_HEADER_TYPE_RE = re.compile('|'.join(_HEADER_TYPE_KEYWORDS))
+
 
 def get_storage(db_path: Optional[str] = None) -> SQLiteBackend:
     """Get or create storage backend."""
@@ -58,25 +108,112 @@ def get_storage(db_path: Optional[str] = None) -> SQLiteBackend:
     return storage
 
 
+def _resolve_id(storage: SQLiteBackend, partial: str) -> UUID:
+    """Resolve a full or partial (prefix) memory ID to a UUID.
+    
+    Raises:
+        ValueError: If no memory or more than one memory matches.
+    """
+    if len(partial) >= 36:
+        return UUID(partial)
+    matches = storage.resolve_id_prefix(partial)
+    if not matches:
+        raise ValueError(f"No memory found matching: {partial}")
+    if len(matches) > 1:
+        raise ValueError(f"Multiple matches for {partial}")
+    return matches[0]
+
+
+def _write_json_array(fragments) -> None:
+    """Write already-serialized JSON values (bytes) to stdout as an array.
+    
+    Values are written one per line as they arrive, so neither the values
+    nor the full document are ever held in memory together.
+    """
+    out = _stdout_bytes()
+    sep = b"[\n"
+    for fragment in fragments:
+        out.write(sep)
+        out.write(fragment)
+        sep = b",\n"
+    out.write(b"[]\n" if sep == b"[\n" else b"\n]\n")
+    out.flush()
+
+
+def _json_default(value):
+    """Serialize the non-JSON types in export dicts the way orjson does."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@functools.cache
+def _load_orjson():
+    """Return the orjson module if it is installed, else None."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _dumps_json(value) -> bytes:
+    """Serialize value to compact UTF-8 JSON, using orjson when it is installed.
+    
+    UUIDs and datetimes may be passed as-is.
+    """
+    orjson = _load_orjson()
+    if orjson is None:
+        return json.dumps(
+            value, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        ).encode("utf-8")
+    return orjson.dumps(value)
+
+
+def _stdout_bytes():
+    """Return stdout's binary buffer, after flushing any text already written."""
+    sys.stdout.flush()
+    return sys.stdout.buffer
+
+
+def _infer_header_type(header_lower: str) -> NodeType:
+    """Infer a node type from a lowercased markdown header in one regex pass."""
+    keywords = _HEADER_TYPE_RE.findall(header_lower)
+    if not keywords:
+        return NodeType.EVENT
+    return _HEADER_TYPE_KEYWORDS[min(keywords, key=_HEADER_TYPE_RANK.__getitem__)]
+
+
+def _truncate(text: str, width: int) -> str:
+    """Cut text to width characters, adding '...' if anything was cut."""
+    return text if len(text) <= width else f"{text[:width]}..."
+
+
+def _is_short_number(text: str, min_len: int, max_len: int) -> bool:
+    """Check that text is min_len..max_len ASCII digits."""
+    return min_len <= len(text) <= max_len and text.isascii() and text.isdigit()
+
+
 def _parse_time_string(time_str: str) -> tuple[int, int]:
     """Parse a time string like '6am', '3pm', '14:30' into (hour, minute)."""
     time_str = time_str.lower().strip()
     
     # Handle am/pm format: 6am, 3pm, 11am, 12pm
-    am_pm_match = re.match(r'^(\d{1,2})(am|pm)$', time_str)
-    if am_pm_match:
-        hour = int(am_pm_match.group(1))
-        is_pm = am_pm_match.group(2) == 'pm'
-        if is_pm and hour != 12:
-            hour += 12
-        elif not is_pm and hour == 12:
-            hour = 0
-        return (hour, 0)
-    
-    # Handle 24h format: 14:30, 6:00
-    time_match = re.match(r'^(\d{1,2}):(\d{2})$', time_str)
-    if time_match:
-        return (int(time_match.group(1)), int(time_match.group(2)))
+    if time_str.endswith(('am', 'pm')):
+        hour_str = time_str[:-2]
+        if _is_short_number(hour_str, 1, 2):
+            hour = int(hour_str)
+            is_pm = time_str[-2] == 'p'
+            if is_pm and hour != 12:
+                hour += 12
+            elif not is_pm and hour == 12:
+                hour = 0
+            return (hour, 0)
+    else:
+        # Handle 24h format: 14:30, 6:00
+        hour_str, sep, minute_str = time_str.partition(':')
+        if sep and _is_short_number(hour_str, 1, 2) and _is_short_number(minute_str, 2, 2):
+            return (int(hour_str), int(minute_str))
     
     raise ValueError(f"Cannot parse time: {time_str}")
 
@@ -108,12 +245,12 @@ def parse_datetime(value: str) -> datetime:
         return (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
     
     # "today 6am", "yesterday 3pm" format
-    today_time_match = re.match(r'^today\s+(.+)$', value_lower)
+    today_time_match = _TODAY_RE.match(value_lower)
     if today_time_match:
         hour, minute = _parse_time_string(today_time_match.group(1))
         return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
     
-    yesterday_time_match = re.match(r'^yesterday\s+(.+)$', value_lower)
+    yesterday_time_match = _YESTERDAY_RE.match(value_lower)
     if yesterday_time_match:
         hour, minute = _parse_time_string(yesterday_time_match.group(1))
         return (now - timedelta(days=1)).replace(hour=hour, minute=minute, second=0, microsecond=0)
@@ -133,7 +270,27 @@ def parse_datetime(value: str) -> datetime:
             except ValueError:
                 pass
     
-    # Use dateutil for flexible parsing (handles ISO 8601 with T/t, natural language, etc.)
+    # Fast path for ISO 8601 (YYYY-MM-DD[ Tt]HH:MM[:SS]) before the slower dateutil
+    if len(value) >= 10 and value[4:5] == "-" and value[:4].isdigit():
+        iso_value = value
+        if len(value) > 10 and value[10] in " t":
+            iso_value = value[:10] + "T" + value[11:]
+        try:
+            return datetime.fromisoformat(iso_value)
+        except ValueError:
+            pass
+    
+    # Fast path for US dates (MM/DD/YYYY) - dateutil reads these month-first too
+    if len(value) == 10 and value[2] == "/" and value[5] == "/":
+        month, day, year = value[:2], value[3:5], value[6:]
+        if month.isdigit() and day.isdigit() and year.isdigit():
+            try:
+                return datetime(int(year), int(month), int(day))
+            except ValueError:
+                pass  # e.g. day-first "13/02/2026": let dateutil decide
+    
+    # Use dateutil for everything else (natural language, etc.)
+    from dateutil import parser as dateutil_parser
     try:
         return dateutil_parser.parse(value)
     except (ValueError, dateutil_parser.ParserError):
@@ -169,7 +326,7 @@ def cli(ctx, db):
 @click.option("--why", help="Reasoning")
 @click.option("--how", help="Method/process")
 @click.option("--tags", "-t", help="Comma-separated tags")
-@click.option("--type", "node_type", type=click.Choice([t.value for t in NodeType]), default="event")
+@click.option("--type", "node_type", type=click.Choice(list(_NODE_TYPES)), default="event")
 @click.option("--artifact", "-a", multiple=True, help="Linked files/URLs (repeatable)")
 @click.option("--link-to", help="Node ID to link this to (creates LED_TO edge)")
 @click.option("--project", help="Project/tree this memory belongs to (e.g., vista, pnpv4)")
@@ -185,52 +342,50 @@ def add(ctx, what, when, who, where, why, how, tags, node_type, artifact, link_t
         engram add "Josh approved the design" --who Josh --type decision
         engram add "Vista can't do weekly costing" --project vista --scope root
     """
-    storage = get_storage(ctx.obj.get("db"))
-    
-    # Parse inputs
+    # Parse inputs first so bad input fails before the database is opened
     when_dt = parse_datetime(when) if when else datetime.now()
-    tags_list = [t.strip() for t in tags.split(",")] if tags else []
+    tags_list = list(map(str.strip, tags.split(","))) if tags else []
     
-    # Create node
-    node = MemoryNode(
-        type=NodeType(node_type),
-        what=what,
-        when=when_dt,
-        where=where,
-        who=list(who),
-        why=why,
-        how=how,
-        project=project,
-        scope=KnowledgeScope(scope),
-        tags=tags_list,
-        artifacts=list(artifact),
-    )
-    
-    node_id = storage.add_node(node)
-    
-    # Create edge if linking
-    if link_to:
-        try:
-            target_id = UUID(link_to)
-            edge = Edge(
-                source_id=target_id,
-                target_id=node_id,
-                type=EdgeType.LED_TO,
-            )
-            storage.add_edge(edge)
-            console.print(f"  ↳ Linked from {link_to[:8]}...", style="dim")
-        except ValueError:
-            console.print(f"  ⚠ Invalid link-to ID: {link_to}", style="yellow")
-    
-    console.print(f"✓ Added memory: [bold]{node_id}[/bold]")
-    console.print(f"  {what[:60]}{'...' if len(what) > 60 else ''}", style="dim")
-    if project or scope == "root":
-        scope_str = f"[cyan]{project or 'global'}[/cyan]" if project else ""
-        if scope == "root":
-            scope_str += " [yellow](root)[/yellow]"
-        console.print(f"  {scope_str}")
-    
-    storage.close()
+    with get_storage(ctx.obj.get("db")) as storage:
+        # Create node
+        node = MemoryNode(
+            type=_NODE_TYPES[node_type],
+            what=what,
+            when=when_dt,
+            where=where,
+            who=list(who),
+            why=why,
+            how=how,
+            project=project,
+            scope=_SCOPES[scope],
+            tags=tags_list,
+            artifacts=list(artifact),
+        )
+        
+        node_id = storage.add_node(node)
+        
+        # Create edge if linking
+        if link_to:
+            try:
+                target_id = UUID(link_to)
+                edge = Edge(
+                    source_id=target_id,
+                    target_id=node_id,
+                    type=EdgeType.LED_TO,
+                )
+                storage.add_edge(edge)
+                console.print(f"  ↳ Linked from {link_to[:8]}...", style="dim")
+            except ValueError:
+                console.print(f"  ⚠ Invalid link-to ID: {link_to}", style="yellow")
+        
+        # Plain status lines skip rich's markup parser (and can't mangle user text)
+        click.echo(f"✓ Added memory: {click.style(str(node_id), bold=True)}")
+        click.echo(click.style(f"  {_truncate(what, 60)}", dim=True))
+        if project or scope == "root":
+            scope_str = f"[cyan]{project or 'global'}[/cyan]" if project else ""
+            if scope == "root":
+                scope_str += " [yellow](root)[/yellow]"
+            console.print(f"  {scope_str}")
 
 
 @cli.command()
@@ -254,101 +409,101 @@ def query(ctx, query, since, until, tags, hops, limit, as_json, project, roots_o
         engram query "costing" --project vista
         engram query "gap" --roots-only
     """
-    storage = get_storage(ctx.obj.get("db"))
-    traverser = MemoryTraverser(storage)
-    
-    results = []
-    
-    # Text search with optional project/scope filtering
-    if query:
-        if project or roots_only:
-            results = storage.query_by_text_filtered(query, project=project, roots_only=roots_only, limit=limit)
-        else:
-            results = storage.query_by_text(query, limit=limit)
-    
-    # Project filter (no text query)
-    elif project:
-        results = storage.query_by_project(project, include_roots=not roots_only, limit=limit)
-    
-    # Roots only (no text query)
-    elif roots_only:
-        results = storage.query_roots_only(limit=limit)
-    
-    # Tag filter
-    elif tags:
-        tag_list = [t.strip() for t in tags.split(",")]
-        results = storage.query_by_tags(tag_list, limit=limit)
-    
-    # Time range
-    elif since or until:
-        since_dt = parse_datetime(since) if since else None
-        until_dt = parse_datetime(until) if until else datetime.now()
-        results = storage.query_by_time(since=since_dt, until=until_dt, limit=limit)
-    
-    else:
-        # Default: recent memories
-        results = storage.query_by_time(limit=limit)
-    
-    # Traverse if requested
-    if hops > 0 and results:
-        expanded = []
-        seen = set()
-        for node in results:
-            if node.id not in seen:
-                seen.add(node.id)
-                expanded.append(node)
-                # Traverse from this node
-                related = traverser.traverse_bfs(node.id, max_hops=hops, include_start=False)
-                for r in related:
-                    if r.node.id not in seen:
-                        seen.add(r.node.id)
-                        expanded.append(r.node)
-        results = expanded
+    from rich.table import Table
     
-    # Output
-    if as_json:
-        output = []
-        for node in results:
-            output.append({
-                "id": str(node.id),
-                "type": node.type.value,
-                "what": node.what,
-                "when": node.when.isoformat() if node.when else None,
-                "who": node.who,
-                "where": node.where,
-                "why": node.why,
-                "tags": node.tags,
-                "project": node.project,
-                "scope": node.scope.value,
-            })
-        print(json.dumps(output, indent=2))
-    else:
-        if not results:
-            console.print("No memories found.", style="dim")
+    with get_storage(ctx.obj.get("db")) as storage:
+        traverser = MemoryTraverser(storage)
+        
+        results = []
+        fast_json = None  # Pre-serialized rows for a plain `query TEXT --json`
+        
+        # Text search with optional project/scope filtering
+        if query:
+            if as_json and hops <= 0 and not (project or roots_only):
+                # SQLite builds the JSON objects: no MemoryNode decode/encode round trip
+                fast_json = storage.query_by_text_json(query, limit=limit)
+            else:
+                results = storage.query_by_text_filtered(query, project=project, roots_only=roots_only, limit=limit)
+        
+        # Project filter (no text query)
+        elif project:
+            results = storage.query_by_project(project, include_roots=not roots_only, limit=limit)
+        
+        # Roots only (no text query)
+        elif roots_only:
+            results = storage.query_roots_only(limit=limit)
+        
+        # Tag filter
+        elif tags:
+            tag_list = [t.strip() for t in tags.split(",")]
+            results = storage.query_by_tags(tag_list, limit=limit)
+        
+        # Time range
+        elif since or until:
+            since_dt = parse_datetime(since) if since else None
+            until_dt = parse_datetime(until) if until else datetime.now()
+            results = storage.query_by_time(since=since_dt, until=until_dt, limit=limit)
+        
         else:
-            table = Table(show_header=True, header_style="bold")
-            table.add_column("When", style="cyan", width=12)
-            table.add_column("What", style="white")
-            table.add_column("Project", style="blue", width=10)
-            table.add_column("Scope", style="yellow", width=6)
-            table.add_column("ID", style="dim", width=8)
-            
-            for node in results:
-                when_str = node.when.strftime("%m/%d %H:%M") if node.when else "?"
-                project_str = node.project or ""
-                scope_str = "🌱" if node.scope.value == "root" else ""
-                table.add_row(
-                    when_str,
-                    node.what[:45] + ("..." if len(node.what) > 45 else ""),
-                    project_str[:10],
-                    scope_str,
-                    str(node.id)[:8],
+            # Default: recent memories
+            results = storage.query_by_time(limit=limit)
+        
+        # Traverse if requested
+        if hops > 0 and results:
+            # One BFS from all matches at once: each hop is a single batched edge lookup
+            related = traverser.traverse_bfs_multi(
+                [node.id for node in results], max_hops=hops, include_start=False
+            )
+            results = list({node.id: node for node in results}.values())
+            results.extend(r.node for r in related)
+        
+        # Output
+        if as_json:
+            if fast_json is not None:
+                _write_json_array(row.encode("utf-8") for row in fast_json)
+            else:
+                # id and when go in as UUID/datetime: orjson (or _json_default)
+                # formats them without a Python-level str()/isoformat() per node
+                _write_json_array(
+                    _dumps_json({
+                        "id": node.id,
+                        "type": node.type.value,
+                        "what": node.what,
+                        "when": node.when,
+                        "who": node.who,
+                        "where": node.where,
+                        "why": node.why,
+                        "tags": node.tags,
+                        "project": node.project,
+                        "scope": node.scope.value,
+                    })
+                    for node in results
                 )
-            
-            console.print(table)
-            console.print(f"\n{len(results)} memories", style="dim")
-    
-    storage.close()
+        else:
+            if not results:
+                console.print("No memories found.", style="dim")
+            else:
+                table = Table(show_header=True, header_style="bold")
+                table.add_column("When", style="cyan", width=12)
+                table.add_column("What", style="white")
+                table.add_column("Project", style="blue", width=10)
+                table.add_column("Scope", style="yellow", width=6)
+                table.add_column("ID", style="dim", width=8)
+                
+                for node in results:
+                    when_str = node.when.strftime("%m/%d %H:%M") if node.when else "?"
+                    project_str = node.project or ""
+                    scope_str = "🌱" if node.scope is KnowledgeScope.ROOT else ""
+                    table.add_row(
+                        when_str,
+                        _truncate(node.what, 45),
+                        project_str[:10],
+                        scope_str,
+                        node.id.hex[:8],
+                    )
+                
+                console.print(table)
+                console.print(f"\n{len(results)} memories", style="dim")
 
 
 @cli.command()
@@ -360,70 +515,62 @@ def show(ctx, node_id):
     Example:
         engram show abc12345
     """
-    storage = get_storage(ctx.obj.get("db"))
+    from rich.panel import Panel
     
-    # Handle partial IDs
-    if len(node_id) < 36:
-        # Search for matching ID prefix
-        all_nodes = storage.query_by_time(limit=1000)
-        matches = [n for n in all_nodes if str(n.id).startswith(node_id)]
-        if len(matches) == 0:
-            console.print(f"No memory found matching: {node_id}", style="red")
-            storage.close()
-            return
-        elif len(matches) > 1:
-            console.print(f"Multiple matches for {node_id}:", style="yellow")
-            for m in matches[:5]:
-                console.print(f"  {m.id} - {m.what[:40]}")
-            storage.close()
+    with get_storage(ctx.obj.get("db")) as storage:
+        # Handle partial IDs
+        if len(node_id) < 36:
+            matches = storage.resolve_id_prefix(node_id, limit=5)
+            if len(matches) == 0:
+                console.print(f"No memory found matching: {node_id}", style="red")
+                return
+            elif len(matches) > 1:
+                console.print(f"Multiple matches for {node_id}:", style="yellow")
+                candidates = storage.get_nodes(matches)
+                for m in candidates.values():
+                    console.print(f"  {m.id} - {m.what[:40]}")
+                return
+            node = storage.get_node(matches[0])
+        else:
+            node = storage.get_node(UUID(node_id))
+        
+        if not node:
+            console.print(f"Memory not found: {node_id}", style="red")
             return
-        node = matches[0]
-    else:
-        node = storage.get_node(UUID(node_id))
-    
-    if not node:
-        console.print(f"Memory not found: {node_id}", style="red")
-        storage.close()
-        return
-    
-    # Display
-    panel_content = []
-    panel_content.append(f"[bold]What:[/bold] {node.what}")
-    if node.when:
-        panel_content.append(f"[bold]When:[/bold] {node.when.strftime('%Y-%m-%d %H:%M:%S')}")
-    if node.who:
-        panel_content.append(f"[bold]Who:[/bold] {', '.join(node.who)}")
-    if node.where:
-        panel_content.append(f"[bold]Where:[/bold] {node.where}")
-    if node.why:
-        panel_content.append(f"[bold]Why:[/bold] {node.why}")
-    if node.how:
-        panel_content.append(f"[bold]How:[/bold] {node.how}")
-    if node.project:
-        panel_content.append(f"[bold]Project:[/bold] {node.project}")
-    scope_display = "🌱 root (shared)" if node.scope.value == "root" else "branch"
-    panel_content.append(f"[bold]Scope:[/bold] {scope_display}")
-    if node.tags:
-        panel_content.append(f"[bold]Tags:[/bold] {', '.join(node.tags)}")
-    if node.artifacts:
-        panel_content.append(f"[bold]Artifacts:[/bold] {', '.join(node.artifacts)}")
-    panel_content.append(f"[bold]Type:[/bold] {node.type.value}")
-    panel_content.append(f"[bold]ID:[/bold] {node.id}")
-    
-    console.print(Panel("\n".join(panel_content), title="Memory", border_style="blue"))
-    
-    # Show connections
-    edges = storage.get_edges(node.id)
-    if edges:
-        console.print("\n[bold]Connections:[/bold]")
-        for edge in edges:
-            direction = "→" if edge.source_id == node.id else "←"
-            other_id = edge.target_id if edge.source_id == node.id else edge.source_id
-            other = storage.get_node(other_id)
-            if other:
-                console.print(f"  {direction} \\[{edge.type.value}] {other.what[:40]}... ({str(other_id)[:8]})")
-    
-    storage.close()
+        
+        # Display
+        panel_content = []
+        panel_content.append(f"[bold]What:[/bold] {node.what}")
+        if node.when:
+            panel_content.append(f"[bold]When:[/bold] {node.when.strftime('%Y-%m-%d %H:%M:%S')}")
+        if node.who:
+            panel_content.append(f"[bold]Who:[/bold] {', '.join(node.who)}")
+        if node.where:
+            panel_content.append(f"[bold]Where:[/bold] {node.where}")
+        if node.why:
+            panel_content.append(f"[bold]Why:[/bold] {node.why}")
+        if node.how:
+            panel_content.append(f"[bold]How:[/bold] {node.how}")
+        if node.project:
+            panel_content.append(f"[bold]Project:[/bold] {node.project}")
+        scope_display = "🌱 root (shared)" if node.scope is KnowledgeScope.ROOT else "branch"
+        panel_content.append(f"[bold]Scope:[/bold] {scope_display}")
+        if node.tags:
+            panel_content.append(f"[bold]Tags:[/bold] {', '.join(node.tags)}")
+        if node.artifacts:
+            panel_content.append(f"[bold]Artifacts:[/bold] {', '.join(node.artifacts)}")
+        panel_content.append(f"[bold]Type:[/bold] {node.type.value}")
+        panel_content.append(f"[bold]ID:[/bold] {node.id}")
+        
+        console.print(Panel("\n".join(panel_content), title="Memory", border_style="blue"))
+        
+        # Show connections (edges and the nodes at their far ends in one query)
+        connections = storage.get_edges_with_endpoints(node.id)
+        if connections:
+            console.print("\n[bold]Connections:[/bold]")
+            for edge, other in connections:
+                direction = "→" if edge.source_id == node.id else "←"
+                console.print(f"  {direction} \\[{edge.type.value}] {other.what[:40]}... ({other.id.hex[:8]})")
 
 
 @cli.command()
@@ -437,39 +584,26 @@ def path(ctx, from_id, to_id, max_hops):
     Example:
         engram path abc123 def456
     """
-    storage = get_storage(ctx.obj.get("db"))
-    traverser = MemoryTraverser(storage)
-    
-    # Resolve partial IDs
-    def resolve_id(partial):
-        if len(partial) >= 36:
-            return UUID(partial)
-        all_nodes = storage.query_by_time(limit=1000)
-        matches = [n for n in all_nodes if str(n.id).startswith(partial)]
-        if len(matches) == 1:
-            return matches[0].id
-        raise ValueError(f"Cannot resolve ID: {partial}")
-    
-    try:
-        from_uuid = resolve_id(from_id)
-        to_uuid = resolve_id(to_id)
-    except ValueError as e:
-        console.print(str(e), style="red")
-        storage.close()
-        return
-    
-    path_nodes = traverser.find_path(from_uuid, to_uuid, max_hops=max_hops)
-    
-    if not path_nodes:
-        console.print(f"No path found within {max_hops} hops.", style="yellow")
-    else:
-        console.print(f"\n[bold]Path ({len(path_nodes)} steps):[/bold]\n")
-        for i, node in enumerate(path_nodes):
-            prefix = "  " if i == 0 else "    ↓\n  "
-            when_str = node.when.strftime("%m/%d %H:%M") if node.when else "?"
-            console.print(f"{prefix}[cyan]{when_str}[/cyan] {node.what[:50]}")
-    
-    storage.close()
+    with get_storage(ctx.obj.get("db")) as storage:
+        traverser = MemoryTraverser(storage)
+        
+        try:
+            from_uuid = _resolve_id(storage, from_id)
+            to_uuid = _resolve_id(storage, to_id)
+        except ValueError as e:
+            console.print(str(e), style="red")
+            return
+        
+        path_nodes = traverser.find_path_bidir(from_uuid, to_uuid, max_hops=max_hops)
+        
+        if not path_nodes:
+            console.print(f"No path found within {max_hops} hops.", style="yellow")
+        else:
+            console.print(f"\n[bold]Path ({len(path_nodes)} steps):[/bold]\n")
+            for i, node in enumerate(path_nodes):
+                prefix = "  " if i == 0 else "    ↓\n  "
+                when_str = node.when.strftime("%m/%d %H:%M") if node.when else "?"
+                console.print(f"{prefix}[cyan]{when_str}[/cyan] {node.what[:50]}")
 
 
 @cli.command()
@@ -482,58 +616,51 @@ def context(ctx, from_id, hops):
     Example:
         engram context abc123 --hops 3
     """
-    storage = get_storage(ctx.obj.get("db"))
-    traverser = MemoryTraverser(storage)
+    from rich.tree import Tree
     
-    # Resolve partial ID
-    if len(from_id) < 36:
-        all_nodes = storage.query_by_time(limit=1000)
-        matches = [n for n in all_nodes if str(n.id).startswith(from_id)]
-        if len(matches) != 1:
-            console.print(f"Cannot resolve ID: {from_id}", style="red")
-            storage.close()
+    with get_storage(ctx.obj.get("db")) as storage:
+        traverser = MemoryTraverser(storage)
+        
+        try:
+            start_node = storage.get_node(_resolve_id(storage, from_id))
+        except ValueError as e:
+            console.print(str(e), style="red")
             return
-        start_node = matches[0]
-    else:
-        start_node = storage.get_node(UUID(from_id))
-    
-    if not start_node:
-        console.print(f"Memory not found: {from_id}", style="red")
-        storage.close()
-        return
-    
-    results = traverser.traverse_bfs(start_node.id, max_hops=hops, include_start=True)
-    
-    # Build tree visualization
-    tree = Tree(f"[bold]{start_node.what[:40]}...[/bold]")
-    
-    # Group by hop count
-    by_hop = {}
-    for r in results:
-        if r.hop_count not in by_hop:
-            by_hop[r.hop_count] = []
-        by_hop[r.hop_count].append(r)
-    
-    # Add to tree
-    for hop in sorted(by_hop.keys()):
-        if hop == 0:
-            continue
-        hop_branch = tree.add(f"[dim]Hop {hop}[/dim]")
-        for r in by_hop[hop]:
-            when_str = r.node.when.strftime("%m/%d") if r.node.when else "?"
-            hop_branch.add(f"[cyan]{when_str}[/cyan] {r.node.what[:40]}...")
-    
-    console.print(tree)
-    console.print(f"\n{len(results)} memories in context", style="dim")
-    
-    storage.close()
+        
+        if not start_node:
+            console.print(f"Memory not found: {from_id}", style="red")
+            return
+        
+        results = traverser.traverse_bfs(start_node.id, max_hops=hops, include_start=True)
+        
+        # Build tree visualization
+        tree = Tree(f"[bold]{start_node.what[:40]}...[/bold]")
+        
+        # Group by hop count
+        by_hop = {}
+        for r in results:
+            if r.hop_count not in by_hop:
+                by_hop[r.hop_count] = []
+            by_hop[r.hop_count].append(r)
+        
+        # Add to tree
+        for hop in sorted(by_hop.keys()):
+            if hop == 0:
+                continue
+            hop_branch = tree.add(f"[dim]Hop {hop}[/dim]")
+            for r in by_hop[hop]:
+                when_str = r.node.when.strftime("%m/%d") if r.node.when else "?"
+                hop_branch.add(f"[cyan]{when_str}[/cyan] {r.node.what[:40]}...")
+        
+        console.print(tree)
+        console.print(f"\n{len(results)} memories in context", style="dim")
 
 
 @cli.command()
 @click.argument("source_id")
 @click.argument("target_id")
 @click.option("--type", "-t", "edge_type", 
-              type=click.Choice([e.value for e in EdgeType]), 
+              type=click.Choice(list(_EDGE_TYPES)), 
               default="relates_to",
               help="Relationship type")
 @click.pass_context
@@ -556,40 +683,22 @@ def relate(ctx, source_id, target_id, edge_type):
         engram relate abc123 def456 --type caused_by
         engram relate <decision-id> <event-id> --type led_to
     """
-    storage = get_storage(ctx.obj.get("db"))
-    
-    # Resolve IDs (simplified - assumes full UUIDs for now)
-    try:
-        source_uuid = UUID(source_id) if len(source_id) >= 36 else None
-        target_uuid = UUID(target_id) if len(target_id) >= 36 else None
+    with get_storage(ctx.obj.get("db")) as storage:
+        try:
+            source_uuid = _resolve_id(storage, source_id)
+            target_uuid = _resolve_id(storage, target_id)
+        except ValueError as e:
+            console.print(f"Invalid ID: {e}", style="red")
+            return
         
-        if not source_uuid or not target_uuid:
-            # Try partial match
-            all_nodes = storage.query_by_time(limit=1000)
-            for n in all_nodes:
-                if str(n.id).startswith(source_id):
-                    source_uuid = n.id
-                if str(n.id).startswith(target_id):
-                    target_uuid = n.id
+        edge = Edge(
+            source_id=source_uuid,
+            target_id=target_uuid,
+            type=_EDGE_TYPES[edge_type],
+        )
         
-        if not source_uuid or not target_uuid:
-            raise ValueError("Could not resolve IDs")
-            
-    except ValueError as e:
-        console.print(f"Invalid ID: {e}", style="red")
-        storage.close()
-        return
-    
-    edge = Edge(
-        source_id=source_uuid,
-        target_id=target_uuid,
-        type=EdgeType(edge_type),
-    )
-    
-    storage.add_edge(edge)
-    console.print(f"✓ Related: {str(source_uuid)[:8]} --[{edge_type}]--> {str(target_uuid)[:8]}")
-    
-    storage.close()
+        storage.add_edge(edge)
+        click.echo(f"✓ Related: {str(source_uuid)[:8]} --[{edge_type}]--> {str(target_uuid)[:8]}")
 
 
 # Alias 'link' to 'relate' for backwards compatibility
@@ -597,7 +706,7 @@ def relate(ctx, source_id, target_id, edge_type):
 @click.argument("source_id")
 @click.argument("target_id")
 @click.option("--type", "-t", "edge_type", 
-              type=click.Choice([e.value for e in EdgeType]), 
+              type=click.Choice(list(_EDGE_TYPES)), 
               default="relates_to")
 @click.pass_context
 def link(ctx, source_id, target_id, edge_type):
@@ -624,47 +733,39 @@ def import_md(ctx, filepath, dry_run, tag):
         engram import-md memory/2026-02-10.md --tag daily-log
         engram import-md notes.md --dry-run
     """
-    import re
-    
-    storage = get_storage(ctx.obj.get("db"))
+    from rich.panel import Panel
     
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
     # Split by ## headers
-    sections = re.split(r'^## ', content, flags=re.MULTILINE)
+    sections = _MD_SECTION_RE.split(content)
     
     nodes_created = []
+    headers = []
+    extra_tags = tuple(tag)
     
     for section in sections[1:]:  # Skip content before first ##
-        if not section.strip():
+        section = section.strip()
+        if not section:
             continue
-            
-        lines = section.strip().split('\n')
-        header = lines[0].strip()
-        body = '\n'.join(lines[1:]).strip()
+        
+        # One partition instead of splitting every line and re-joining the body
+        header, _, body = section.partition('\n')
+        header = header.strip()
+        body = body.strip()
         
         if not body:
             continue
         
-        # Infer node type from header/content
-        header_lower = header.lower()
-        if any(w in header_lower for w in ['lesson', 'learned', 'insight']):
-            node_type = NodeType.INSIGHT
-        elif any(w in header_lower for w in ['decision', 'chose', 'decided']):
-            node_type = NodeType.DECISION
-        elif any(w in header_lower for w in ['todo', 'task', 'action']):
-            node_type = NodeType.TASK
-        elif any(w in header_lower for w in ['project', 'module', 'feature']):
-            node_type = NodeType.PROJECT
-        elif any(w in header_lower for w in ['person', 'who', 'contact']):
-            node_type = NodeType.PERSON
-        else:
-            node_type = NodeType.EVENT
+        # Infer node type from header
+        node_type = _infer_header_type(header.lower())
         
         # Create tags from header words + provided tags
-        header_tags = [w.lower() for w in re.findall(r'\w+', header) if len(w) > 2]
-        all_tags = list(set(header_tags + list(tag)))
+        # (dict.fromkeys dedupes while keeping first-seen order)
+        tag_set = dict.fromkeys(w.lower() for w in _WORD_RE.findall(header) if len(w) > 2)
+        tag_set.update(dict.fromkeys(extra_tags))
+        all_tags = list(tag_set)
         
         node = MemoryNode(
             type=node_type,
@@ -677,20 +778,26 @@ def import_md(ctx, filepath, dry_run, tag):
                 f"[bold]{header}[/bold]\n\n"
                 f"Type: {node_type.value}\n"
                 f"Tags: {', '.join(all_tags)}\n"
-                f"Content: {body[:200]}{'...' if len(body) > 200 else ''}",
-                title=f"[dim]{str(node.id)[:8]}[/dim]"
+                f"Content: {_truncate(body, 200)}",
+                title=f"[dim]{node.id.hex[:8]}[/dim]"
             ))
         else:
-            storage.add_node(node)
             nodes_created.append(node)
-            console.print(f"✓ {str(node.id)[:8]}: {header[:50]}")
+            headers.append(header)
+    
+    if nodes_created:
+        # Parsing is done before the database is opened, and a dry run or a
+        # file with no sections never opens it at all. One executemany +
+        # commit for the whole file instead of one per section.
+        with get_storage(ctx.obj.get("db")) as storage:
+            storage.add_nodes(nodes_created)
+        for node, header in zip(nodes_created, headers):
+            click.echo(f"✓ {node.id.hex[:8]}: {header[:50]}")
     
     if dry_run:
         console.print(f"\n[yellow]Dry run:[/yellow] Would create {len(sections) - 1} nodes")
     else:
         console.print(f"\n[green]Imported:[/green] {len(nodes_created)} nodes from {filepath}")
-    
-    storage.close()
 
 
 @cli.command()
@@ -711,44 +818,43 @@ def trees(ctx):
     Example:
         engram trees
     """
-    storage = get_storage(ctx.obj.get("db"))
-    
-    stats = storage.get_project_stats()
-    
-    if not stats['projects'] and stats['total_roots'] == 0:
-        console.print("[yellow]No projects or roots found yet.[/yellow]")
-        console.print("Use --project and --scope when adding memories:", style="dim")
-        console.print("  engram add \"fact\" --project vista --scope branch", style="dim")
-        console.print("  engram add \"insight\" --project vista --scope root", style="dim")
-        storage.close()
-        return
-    
-    console.print(Panel("[bold]🌳 Project Trees[/bold]", style="green"))
+    from rich.panel import Panel
+    from rich.table import Table
     
-    if stats['projects']:
-        table = Table(show_header=True, header_style="bold")
-        table.add_column("Project", style="cyan")
-        table.add_column("Total", justify="right")
-        table.add_column("Branches", justify="right", style="green")
-        table.add_column("Roots 🌱", justify="right", style="yellow")
+    with get_storage(ctx.obj.get("db")) as storage:
+        stats = storage.get_project_stats()
         
-        for proj in stats['projects']:
-            table.add_row(
-                proj['name'],
-                str(proj['node_count']),
-                str(proj['branch_count']),
-                str(proj['root_count']),
-            )
+        if not stats['projects'] and stats['total_roots'] == 0:
+            console.print("[yellow]No projects or roots found yet.[/yellow]")
+            console.print("Use --project and --scope when adding memories:", style="dim")
+            console.print("  engram add \"fact\" --project vista --scope branch", style="dim")
+            console.print("  engram add \"insight\" --project vista --scope root", style="dim")
+            return
         
-        console.print(table)
-    else:
-        console.print("[dim]No named projects yet.[/dim]")
-    
-    console.print(f"\n[bold]Root Knowledge (shared):[/bold] {stats['total_roots']} nodes")
-    if stats['orphan_roots'] > 0:
-        console.print(f"  [dim]({stats['orphan_roots']} roots not assigned to any project)[/dim]")
-    
-    storage.close()
+        console.print(Panel("[bold]🌳 Project Trees[/bold]", style="green"))
+        
+        if stats['projects']:
+            table = Table(show_header=True, header_style="bold")
+            table.add_column("Project", style="cyan")
+            table.add_column("Total", justify="right")
+            table.add_column("Branches", justify="right", style="green")
+            table.add_column("Roots 🌱", justify="right", style="yellow")
+            
+            for proj in stats['projects']:
+                table.add_row(
+                    proj['name'],
+                    str(proj['node_count']),
+                    str(proj['branch_count']),
+                    str(proj['root_count']),
+                )
+            
+            console.print(table)
+        else:
+            console.print("[dim]No named projects yet.[/dim]")
+        
+        console.print(f"\n[bold]Root Knowledge (shared):[/bold] {stats['total_roots']} nodes")
+        if stats['orphan_roots'] > 0:
+            console.print(f"  [dim]({stats['orphan_roots']} roots not assigned to any project)[/dim]")
 
 
 @cli.command()
@@ -765,76 +871,60 @@ def stats(ctx):
     Example:
         engram stats
     """
-    from collections import Counter
-    
-    storage = get_storage(ctx.obj.get("db"))
-    
-    # Get all nodes and edges
-    all_nodes = storage.query_by_time(limit=10000)
-    
-    if not all_nodes:
-        console.print("[yellow]No memories stored yet.[/yellow]")
-        storage.close()
-        return
-    
-    # Count by type
-    type_counts = Counter(n.type.value for n in all_nodes)
-    
-    # Get all edges
-    edge_counts = Counter()
-    node_edge_counts = Counter()
-    
-    for node in all_nodes:
-        edges = storage.get_edges(node.id)
-        for edge in edges:
-            edge_counts[edge.type.value] += 1
-            node_edge_counts[node.id] += 1
-    
-    # Date range
-    dates = [n.when for n in all_nodes if n.when]
-    min_date = min(dates) if dates else None
-    max_date = max(dates) if dates else None
-    
-    # Build output
-    console.print(Panel("[bold]Engram Memory Statistics[/bold]", style="blue"))
-    
-    # Node counts
-    console.print("\n[bold]Nodes by Type:[/bold]")
-    node_table = Table(show_header=False, box=None)
-    node_table.add_column("Type", style="cyan")
-    node_table.add_column("Count", justify="right")
-    for ntype, count in sorted(type_counts.items(), key=lambda x: -x[1]):
-        node_table.add_row(ntype, str(count))
-    node_table.add_row("[bold]Total[/bold]", f"[bold]{len(all_nodes)}[/bold]")
-    console.print(node_table)
-    
-    # Edge counts
-    if edge_counts:
-        console.print("\n[bold]Edges by Type:[/bold]")
-        edge_table = Table(show_header=False, box=None)
-        edge_table.add_column("Type", style="green")
-        edge_table.add_column("Count", justify="right")
-        for etype, count in sorted(edge_counts.items(), key=lambda x: -x[1]):
-            edge_table.add_row(etype, str(count))
-        edge_table.add_row("[bold]Total[/bold]", f"[bold]{sum(edge_counts.values())}[/bold]")
-        console.print(edge_table)
-    else:
-        console.print("\n[dim]No edges yet.[/dim]")
-    
-    # Date range
-    if min_date and max_date:
-        console.print(f"\n[bold]Date Range:[/bold] {min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}")
-    
-    # Most connected
-    if node_edge_counts:
-        console.print("\n[bold]Most Connected Nodes:[/bold]")
-        for node_id, count in node_edge_counts.most_common(5):
-            node = storage.get_node(node_id)
-            if node:
-                what_preview = node.what[:50] + "..." if len(node.what) > 50 else node.what
-                console.print(f"  {str(node_id)[:8]}: {count} edges - {what_preview}")
+    from rich.panel import Panel
+    from rich.table import Table
     
-    storage.close()
+    with get_storage(ctx.obj.get("db")) as storage:
+        graph_stats = storage.get_graph_stats()
+        
+        if not graph_stats["node_count"]:
+            console.print("[yellow]No memories stored yet.[/yellow]")
+            return
+        
+        type_counts = graph_stats["node_types"]
+        edge_counts = graph_stats["edge_types"]
+        min_date = graph_stats["min_date"]
+        max_date = graph_stats["max_date"]
+        
+        # Build output
+        console.print(Panel("[bold]Engram Memory Statistics[/bold]", style="blue"))
+        
+        # Node counts
+        console.print("\n[bold]Nodes by Type:[/bold]")
+        node_table = Table(show_header=False, box=None)
+        node_table.add_column("Type", style="cyan")
+        node_table.add_column("Count", justify="right")
+        for ntype, count in sorted(type_counts.items(), key=lambda x: -x[1]):
+            node_table.add_row(ntype, str(count))
+        node_table.add_row("[bold]Total[/bold]", f"[bold]{graph_stats['node_count']}[/bold]")
+        console.print(node_table)
+        
+        # Edge counts
+        if edge_counts:
+            console.print("\n[bold]Edges by Type:[/bold]")
+            edge_table = Table(show_header=False, box=None)
+            edge_table.add_column("Type", style="green")
+            edge_table.add_column("Count", justify="right")
+            for etype, count in sorted(edge_counts.items(), key=lambda x: -x[1]):
+                edge_table.add_row(etype, str(count))
+            edge_table.add_row("[bold]Total[/bold]", f"[bold]{sum(edge_counts.values())}[/bold]")
+            console.print(edge_table)
+        else:
+            console.print("\n[dim]No edges yet.[/dim]")
+        
+        # Date range
+        if min_date and max_date:
+            console.print(f"\n[bold]Date Range:[/bold] {min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}")
+        
+        # Most connected
+        if graph_stats["most_connected"]:
+            console.print("\n[bold]Most Connected Nodes:[/bold]")
+            top_nodes = storage.get_nodes(node_id for node_id, _ in graph_stats["most_connected"])
+            for node_id, count in graph_stats["most_connected"]:
+                node = top_nodes.get(node_id)
+                if node:
+                    what_preview = _truncate(node.what, 50)
+                    console.print(f"  {node_id.hex[:8]}: {count} edges - {what_preview}")
 
 
 @cli.command()
@@ -850,75 +940,64 @@ def export(ctx, output_format, since, limit):
         engram export --format json > memories.json
         engram export --since yesterday --format md
     """
-    storage = get_storage(ctx.obj.get("db"))
-    
-    since_dt = parse_datetime(since) if since else None
-    nodes = storage.query_by_time(since=since_dt, limit=limit)
-    
-    if not nodes:
-        console.print("[yellow]No memories to export.[/yellow]")
-        storage.close()
-        return
-    
-    if output_format == "json":
-        import json
-        output = []
-        for node in nodes:
-            node_dict = {
-                "id": str(node.id),
-                "type": node.type.value,
-                "what": node.what,
-                "when": node.when.isoformat() if node.when else None,
-                "where": node.where,
-                "who": node.who,
-                "why": node.why,
-                "how": node.how,
-                "tags": node.tags,
-                "artifacts": node.artifacts,
-            }
-            # Get edges
-            edges = storage.get_edges(node.id)
-            if edges:
-                node_dict["edges"] = [
-                    {"target": str(e.target_id), "type": e.type.value}
-                    for e in edges
-                ]
-            output.append(node_dict)
-        print(json.dumps(output, indent=2))
-    else:
-        # Markdown format
-        print("# Engram Memory Export\n")
-        print(f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-        print(f"Total: {len(nodes)} memories\n")
-        print("---\n")
+    with get_storage(ctx.obj.get("db")) as storage:
+        since_dt = parse_datetime(since) if since else None
+        
+        # Nodes are streamed from the database, so count them up front
+        total = min(storage.count_nodes(since=since_dt), limit)
+        if not total:
+            console.print("[yellow]No memories to export.[/yellow]")
+            return
+        
+        if output_format == "json":
+            # SQLite builds each record, edges included; rows go straight to stdout
+            records = storage.export_nodes_json(since=since_dt, limit=limit)
+            _write_json_array(record.encode("utf-8") for record in records)
+            return
+        
+        # Markdown format: nodes are read, given their edges and written in blocks,
+        # each block as one write rather than one print() call per line
+        parts = [
+            "# Engram Memory Export\n\n",
+            f"Exported: {datetime.now().isoformat(' ', 'minutes')}\n\n",
+            f"Total: {total} memories\n\n",
+            "---\n\n",
+        ]
+        append = parts.append
         
-        for node in nodes:
-            print(f"## {node.what[:80]}\n")
-            print(f"- **ID:** `{str(node.id)[:8]}`")
-            print(f"- **Type:** {node.type.value}")
-            if node.when:
-                print(f"- **When:** {node.when.strftime('%Y-%m-%d %H:%M')}")
-            if node.tags:
-                print(f"- **Tags:** {', '.join(node.tags)}")
-            if node.who:
-                print(f"- **Who:** {', '.join(node.who)}")
-            if node.where:
-                print(f"- **Where:** {node.where}")
-            if node.why:
-                print(f"- **Why:** {node.why}")
-            if node.how:
-                print(f"- **How:** {node.how}")
+        # SQLite formats the timestamp and joins tags/who, so rows are used as-is
+        rows = storage.iter_export_rows(since=since_dt, limit=limit)
+        while batch := list(islice(rows, _EXPORT_WRITE_BATCH)):
+            node_ids = [UUID(row["id"]) for row in batch]
             
-            # Edges
-            edges = storage.get_edges(node.id)
-            if edges:
-                print(f"- **Edges:**")
-                for e in edges:
-                    print(f"  - {e.type.value} → `{str(e.target_id)[:8]}`")
+            # Every edge for the block in one round trip instead of one query per node
+            edges_by_node = storage.get_edges_bulk(node_ids)
             
-            print()
-    
-    storage.close()
+            for node_id, (nid, ntype, what, where, why, how, when, tags, who) in zip(node_ids, batch):
+                # Optional lines are "" when absent so each node is one string
+                when_line = f"- **When:** {when}\n" if when else ""
+                tags_line = f"- **Tags:** {tags}\n" if tags else ""
+                who_line = f"- **Who:** {who}\n" if who else ""
+                where_line = f"- **Where:** {where}\n" if where else ""
+                why_line = f"- **Why:** {why}\n" if why else ""
+                how_line = f"- **How:** {how}\n" if how else ""
+                
+                # Edges
+                edges = edges_by_node.get(node_id)
+                edge_lines = "- **Edges:**\n" + "".join([
+                    f"  - {e.type.value} → `{e.target_id.hex[:8]}`\n" for e in edges
+                ]) if edges else ""
+                
+                append(
+                    f"## {what[:80]}\n\n"
+                    f"- **ID:** `{nid[:8]}`\n"
+                    f"- **Type:** {ntype}\n"
+                    f"{when_line}{tags_line}{who_line}{where_line}{why_line}{how_line}"
+                    f"{edge_lines}\n"
+                )
+            
+            sys.stdout.write("".join(parts))
+            parts.clear()
 
 
 @cli.command("import-git")
@@ -944,49 +1023,46 @@ def import_git(ctx, repo_path, max_commits, since, until, skip_merge, link, dry_
     from pathlib import Path
     from engram.ingest import import_git_repo, CommitFilter
     
-    storage = get_storage(ctx.obj.get("db"))
-    
-    # Build filter config
-    filter_config = CommitFilter(
-        skip_merge=skip_merge,
-        max_commits=max_commits,
-    )
-    
-    if since:
-        filter_config.since = parse_datetime(since)
-    if until:
-        filter_config.until = parse_datetime(until)
-    
-    repo_path = Path(repo_path)
-    
-    console.print(f"[bold]Importing from:[/bold] {repo_path.name}")
-    if dry_run:
-        console.print("[yellow]Dry run mode[/yellow]")
-    
-    try:
-        stats = import_git_repo(
-            storage,
-            repo_path,
-            filter_config=filter_config,
-            link_related=link,
-            dry_run=dry_run,
+    with get_storage(ctx.obj.get("db")) as storage:
+        # Build filter config
+        filter_config = CommitFilter(
+            skip_merge=skip_merge,
+            max_commits=max_commits,
         )
         
-        console.print(f"\n[bold]Results:[/bold]")
-        console.print(f"  Total commits scanned: {stats['total_commits']}")
-        console.print(f"  Significant commits: {stats['significant_commits']}")
+        if since:
+            filter_config.since = parse_datetime(since)
+        if until:
+            filter_config.until = parse_datetime(until)
         
+        repo_path = Path(repo_path)
+        
+        console.print(f"[bold]Importing from:[/bold] {repo_path.name}")
         if dry_run:
-            console.print(f"\n[yellow]Would create {stats['significant_commits']} nodes[/yellow]")
-        else:
-            console.print(f"  Nodes created: [green]{stats['nodes_created']}[/green]")
-            console.print(f"  Nodes skipped (duplicates): {stats['nodes_skipped']}")
-            console.print(f"  Edges created: {stats['edges_created']}")
+            console.print("[yellow]Dry run mode[/yellow]")
+        
+        try:
+            stats = import_git_repo(
+                storage,
+                repo_path,
+                filter_config=filter_config,
+                link_related=link,
+                dry_run=dry_run,
+            )
             
-    except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
-    
-    storage.close()
+            console.print(f"\n[bold]Results:[/bold]")
+            console.print(f"  Total commits scanned: {stats['total_commits']}")
+            console.print(f"  Significant commits: {stats['significant_commits']}")
+            
+            if dry_run:
+                console.print(f"\n[yellow]Would create {stats['significant_commits']} nodes[/yellow]")
+            else:
+                console.print(f"  Nodes created: [green]{stats['nodes_created']}[/green]")
+                console.print(f"  Nodes skipped (duplicates): {stats['nodes_skipped']}")
+                console.print(f"  Edges created: {stats['edges_created']}")
+                
+        except Exception as e:
+            console.print(f"[red]Error:[/red] {e}")
 
 
 @cli.command("import-md-dir")
@@ -1010,40 +1086,83 @@ def import_md_dir(ctx, dir_path, pattern, tag, link_by_date, dry_run):
     from pathlib import Path
     from engram.ingest import import_markdown_dir
     
-    storage = get_storage(ctx.obj.get("db"))
-    
-    dir_path = Path(dir_path)
-    
-    console.print(f"[bold]Importing from:[/bold] {dir_path}")
-    console.print(f"[bold]Pattern:[/bold] {pattern}")
-    if dry_run:
-        console.print("[yellow]Dry run mode[/yellow]")
-    
-    try:
-        stats = import_markdown_dir(
-            storage,
-            dir_path,
-            pattern=pattern,
-            extra_tags=list(tag),
-            link_by_date=link_by_date,
-            dry_run=dry_run,
-        )
-        
-        console.print(f"\n[bold]Results:[/bold]")
-        console.print(f"  Files processed: {stats['files_processed']}")
-        console.print(f"  Sections found: {stats['sections_found']}")
+    with get_storage(ctx.obj.get("db")) as storage:
+        dir_path = Path(dir_path)
         
+        console.print(f"[bold]Importing from:[/bold] {dir_path}")
+        console.print(f"[bold]Pattern:[/bold] {pattern}")
         if dry_run:
-            console.print(f"\n[yellow]Would create {stats['sections_found']} nodes[/yellow]")
-        else:
-            console.print(f"  Nodes created: [green]{stats['nodes_created']}[/green]")
-            console.print(f"  Nodes skipped (duplicates): {stats['nodes_skipped']}")
-            console.print(f"  Edges created: {stats['edges_created']}")
+            console.print("[yellow]Dry run mode[/yellow]")
+        
+        try:
+            stats = import_markdown_dir(
+                storage,
+                dir_path,
+                pattern=pattern,
+                extra_tags=list(tag),
+                link_by_date=link_by_date,
+                dry_run=dry_run,
+            )
             
-    except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
+            console.print(f"\n[bold]Results:[/bold]")
+            console.print(f"  Files processed: {stats['files_processed']}")
+            console.print(f"  Sections found: {stats['sections_found']}")
+            
+            if dry_run:
+                console.print(f"\n[yellow]Would create {stats['sections_found']} nodes[/yellow]")
+            else:
+                console.print(f"  Nodes created: [green]{stats['nodes_created']}[/green]")
+                console.print(f"  Nodes skipped (duplicates): {stats['nodes_skipped']}")
+                console.print(f"  Edges created: {stats['edges_created']}")
+                
+        except Exception as e:
+            console.print(f"[red]Error:[/red] {e}")
+
+
+@cli.command()
+@click.pass_context
+def shell(ctx):
+    """Run engram commands from stdin against one open database.
+    
+    Reads one command per line (without the leading "engram"). The database
+    stays open between commands, so each one reuses the same connection
+    instead of reconnecting and re-checking the schema. Blank lines and
+    lines starting with # are skipped; "exit" or "quit" stops early.
     
-    storage.close()
+    Examples:
+        engram shell < commands.txt
+        printf 'add "Shipped v2"\nquery v2\n' | engram shell
+    """
+    import shlex
+    
+    db = ctx.obj.get("db")
+    prefix = ["--db", db] if db else []
+    interactive = sys.stdin.isatty()
+    
+    # Held open for the whole session: commands opening the same file in
+    # this thread share its connection rather than opening a new one
+    with get_storage(db) as storage:
+        while True:
+            try:
+                line = input("engram> " if interactive else "")
+            except EOFError:
+                break
+            
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line in ("exit", "quit"):
+                break
+            
+            try:
+                args = shlex.split(line)
+                cli.main(args=prefix + args, prog_name="engram", obj={}, standalone_mode=False)
+            except click.ClickException as e:
+                e.show()
+            except click.Abort:
+                click.echo("Aborted!", err=True)
+            except ValueError as e:
+                click.echo(f"Error: {e}", err=True)
 
 
 @cli.command()
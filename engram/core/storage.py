@@ -4,12 +4,165 @@ Storage backends for Engram.
 Abstracts persistence so we can swap SQLite/Postgres/Neo4j.
 """
 
+import os
+import sqlite3
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from uuid import UUID
 
-from .models import MemoryNode, Edge, EdgeType, KnowledgeScope, QueryResult
+from .models import MemoryNode, Edge, EdgeType, KnowledgeScope, NodeType, QueryResult
+
+# Decodes the who/tags/artifacts arrays of every node row; orjson (the `fast`
+# extra) is several times quicker than json for these short lists
+try:
+    from orjson import loads as _loads_list
+except ImportError:
+    from json import loads as _loads_list
+
+# Stored in PRAGMA user_version; bump whenever initialize() DDL changes
+SCHEMA_VERSION = 5
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds
+SQLITE_MAX_VARIABLES = 999
+
+_CONNECTION_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "cache_size=-65536",      # 64 MB page cache
+    "mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "temp_store=MEMORY",
+    "busy_timeout=30000",     # ms to wait on a locked database
+)
+
+_INSERT_NODE_SQL = """
+    INSERT INTO nodes (id, type, what, when_ts, where_ctx, who, why, how,
+                     project, scope, tags, artifacts, embedding, confidence, source,
+                     created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_EDGE_SQL = """
+    INSERT INTO edges (id, source_id, target_id, type, weight, metadata, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT_NODE_SQL = "SELECT * FROM nodes WHERE id = ?"
+
+_UPDATE_NODE_SQL = """
+    UPDATE nodes SET
+        type = ?, what = ?, when_ts = ?, where_ctx = ?, who = ?,
+        why = ?, how = ?, project = ?, scope = ?, tags = ?, artifacts = ?, embedding = ?,
+        confidence = ?, source = ?, updated_at = ?
+    WHERE id = ?
+"""
+
+_DELETE_NODE_SQL = "DELETE FROM nodes WHERE id = ?"
+
+_DELETE_EDGE_SQL = "DELETE FROM edges WHERE id = ?"
+
+_DELETE_NODE_EDGES_SQL = "DELETE FROM edges WHERE source_id = ? OR target_id = ?"
+
+_SELECT_EDGES_SQL = {
+    "outgoing": "SELECT * FROM edges WHERE source_id = ?",
+    "incoming": "SELECT * FROM edges WHERE target_id = ?",
+    "both": "SELECT * FROM edges WHERE source_id = ? OR target_id = ?",
+}
+
+_SELECT_EDGES_BY_TYPE_SQL = {
+    "outgoing": "SELECT * FROM edges WHERE source_id = ? AND type = ?",
+    "incoming": "SELECT * FROM edges WHERE target_id = ? AND type = ?",
+    "both": "SELECT * FROM edges WHERE (source_id = ? OR target_id = ?) AND type = ?",
+}
+
+# Each edge touching a node joined to the node at its other end. Edge columns
+# are aliased so they don't shadow the node's own id/type/created_at.
+_SELECT_EDGES_WITH_ENDPOINTS_SQL = """
+    SELECT
+        e.id AS edge_id, e.source_id, e.target_id, e.type AS edge_type,
+        e.weight, e.metadata, e.created_at AS edge_created_at,
+        n.*
+    FROM edges e
+    JOIN nodes n ON n.id = CASE WHEN e.source_id = ? THEN e.target_id ELSE e.source_id END
+    WHERE e.source_id = ? OR e.target_id = ?
+"""
+
+# Prepared statements kept per connection; comfortably above the distinct SQL we issue
+_STATEMENT_CACHE_SIZE = 256
+
+# A node row as a JSON object with the summary fields the CLI prints for
+# `query --json`; the JSON columns are embedded as-is instead of decoded
+_NODE_SUMMARY_JSON = """json_object(
+    'id', nodes.id,
+    'type', nodes.type,
+    'what', nodes.what,
+    'when', nodes.when_ts,
+    'who', json(COALESCE(nodes.who, '[]')),
+    'where', nodes.where_ctx,
+    'why', nodes.why,
+    'tags', json(COALESCE(nodes.tags, '[]')),
+    'project', nodes.project,
+    'scope', COALESCE(nodes.scope, 'branch')
+)"""
+
+# Enum members by stored value: a dict lookup skips Enum.__call__ per decoded row
+_NODE_TYPES = {t.value: t for t in NodeType}
+_EDGE_TYPES = {t.value: t for t in EdgeType}
+_SCOPES = {s.value: s for s in KnowledgeScope}
+
+# A full node record for `export --format json`, with the node's edges appended
+# as "edges" (omitted when there are none, hence the NULLIF). The outer query
+# repeats the ORDER BY since SQLite doesn't promise to keep a subquery's order.
+_NODE_EXPORT_JSON_SQL = """
+    SELECT CASE WHEN edges IS NULL THEN node ELSE json_set(node, '$.edges', json(edges)) END
+    FROM (
+        SELECT
+            json_object(
+                'id', nodes.id,
+                'type', nodes.type,
+                'what', nodes.what,
+                'when', nodes.when_ts,
+                'where', nodes.where_ctx,
+                'who', json(COALESCE(nodes.who, '[]')),
+                'why', nodes.why,
+                'how', nodes.how,
+                'tags', json(COALESCE(nodes.tags, '[]')),
+                'artifacts', json(COALESCE(nodes.artifacts, '[]'))
+            ) AS node,
+            (
+                SELECT NULLIF(
+                    json_group_array(json_object('target', e.target_id, 'type', e.type)),
+                    '[]'
+                )
+                FROM edges e
+                WHERE e.source_id = nodes.id OR e.target_id = nodes.id
+            ) AS edges,
+            nodes.when_ts AS when_ts
+        FROM nodes
+        {where}
+        ORDER BY when_ts DESC
+        LIMIT ?
+    )
+    ORDER BY when_ts DESC
+"""
+
+# Node fields for the markdown export, with list columns pre-joined and the
+# timestamp cut to minutes by SQLite rather than decoded per row in Python
+_NODE_EXPORT_ROW_SQL = """
+    SELECT
+        id, type, what, where_ctx, why, how,
+        replace(substr(when_ts, 1, 16), 'T', ' ') AS when_min,
+        (SELECT group_concat(value, ', ') FROM json_each(nodes.tags)) AS tags_csv,
+        (SELECT group_concat(value, ', ') FROM json_each(nodes.who)) AS who_csv
+    FROM nodes
+    {where}
+    ORDER BY when_ts DESC
+    LIMIT ?
+"""
+
+# Characters that can appear in the text form of a UUID
+_UUID_CHARS = "0123456789abcdef-"
 
 
 class StorageBackend(ABC):
@@ -25,17 +178,53 @@ class StorageBackend(ABC):
         """Clean up resources."""
         pass
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     # Node operations
     @abstractmethod
     def add_node(self, node: MemoryNode) -> UUID:
         """Store a memory node. Returns the node ID."""
         pass
     
+    def add_nodes(self, nodes: list[MemoryNode]) -> list[UUID]:
+        """Store several memory nodes. Returns their IDs."""
+        return [self.add_node(node) for node in nodes]
+    
+    def add_node_with_edges(self, node: MemoryNode, edges: list[Edge]) -> UUID:
+        """Store a node together with edges that reference it. Returns the node ID."""
+        node_id = self.add_node(node)
+        self.add_edges(edges)
+        return node_id
+    
     @abstractmethod
     def get_node(self, node_id: UUID) -> Optional[MemoryNode]:
         """Retrieve a node by ID."""
         pass
     
+    def get_nodes(
+        self,
+        node_ids: Iterable[UUID],
+        limit: Optional[int] = None
+    ) -> dict[UUID, MemoryNode]:
+        """Retrieve several nodes at once, keyed by ID. Missing IDs are omitted.
+        
+        If limit is given, only the most recent `limit` nodes are returned,
+        ordered newest first.
+        """
+        nodes = {}
+        for node_id in node_ids:
+            node = self.get_node(node_id)
+            if node:
+                nodes[node_id] = node
+        if limit is None:
+            return nodes
+        recent = sorted(nodes.values(), key=lambda n: n.when or datetime.min, reverse=True)
+        return {n.id: n for n in recent[:limit]}
+    
     @abstractmethod
     def update_node(self, node: MemoryNode) -> bool:
         """Update an existing node. Returns success."""
@@ -52,6 +241,10 @@ class StorageBackend(ABC):
         """Create a relationship between nodes."""
         pass
     
+    def add_edges(self, edges: list[Edge]) -> list[UUID]:
+        """Create several relationships. Returns their IDs."""
+        return [self.add_edge(edge) for edge in edges]
+    
     @abstractmethod
     def get_edges(
         self,
@@ -62,6 +255,40 @@ class StorageBackend(ABC):
         """Get edges connected to a node."""
         pass
     
+    def get_edges_bulk(
+        self,
+        node_ids: Iterable[UUID],
+        direction: str = "both"
+    ) -> dict[UUID, list[Edge]]:
+        """Get edges connected to each of several nodes, keyed by node ID.
+        
+        Nodes without edges are omitted. An edge between two of the given
+        nodes is listed under both of them.
+        """
+        edges_by_node = {}
+        for node_id in dict.fromkeys(node_ids):
+            edges = self.get_edges(node_id, direction=direction)
+            if edges:
+                edges_by_node[node_id] = edges
+        return edges_by_node
+    
+    def get_neighbors(
+        self,
+        node_ids: Iterable[UUID],
+        direction: str = "both",
+        edge_types: Optional[list[EdgeType]] = None
+    ) -> list[tuple[UUID, UUID]]:
+        """Get (node_id, neighbor_id) pairs for every edge touching the given nodes."""
+        pairs = []
+        for node_id in node_ids:
+            for edge_type in (edge_types or [None]):
+                for edge in self.get_edges(node_id, direction=direction, edge_type=edge_type):
+                    if edge.source_id == node_id:
+                        pairs.append((node_id, edge.target_id))
+                    else:
+                        pairs.append((node_id, edge.source_id))
+        return pairs
+    
     @abstractmethod
     def delete_edge(self, edge_id: UUID) -> bool:
         """Remove an edge."""
@@ -108,22 +335,74 @@ class StorageBackend(ABC):
         pass
 
 
+class _SharedConnection:
+    """A SQLite connection shared by every backend on one file in one thread."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.refs = 0
+        self.batch_depth = 0  # Open begin_batch() calls across all sharers
+
+
+_thread_local = threading.local()
+
+
+def _thread_connections() -> dict[str, _SharedConnection]:
+    """This thread's open connections, keyed by absolute database path."""
+    connections = getattr(_thread_local, "connections", None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+    return connections
+
+
 class SQLiteBackend(StorageBackend):
     """SQLite storage backend - good for local/single-agent use."""
     
     def __init__(self, db_path: str = "engram.db"):
         self.db_path = db_path
         self.conn = None
+        self._shared: Optional[_SharedConnection] = None
     
     def initialize(self) -> None:
-        import sqlite3
-        import json
+        if self._shared is not None:
+            self.close()
+        
+        # Backends on the same file in the same thread share one connection,
+        # so its statement cache, page cache and mmap stay warm between them
+        key = None if self.db_path == ":memory:" else os.path.abspath(self.db_path)
+        connections = _thread_connections()
+        shared = connections.get(key) if key else None
         
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+        if shared is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            shared = _SharedConnection(conn)
+            self.conn = conn
+            self._setup_connection()
+            if key:
+                connections[key] = shared
+        
+        shared.refs += 1
+        self._shared = shared
+        self.conn = shared.conn
+    
+    def _setup_connection(self) -> None:
+        """Apply PRAGMAs and bring the schema up to date on a new connection."""
+        # WAL lets readers run alongside the agent's writes; NORMAL sync is
+        # durable under WAL and drops an fsync per commit
+        for pragma in _CONNECTION_PRAGMAS:
+            self.conn.execute(f"PRAGMA {pragma}")
         
-        # Enable JSON functions
-        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Schema already current - skip the DDL and migrations
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        # Databases from before full-text search get an empty nodes_fts below;
+        # it is filled from the stored rows once the table exists
+        had_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'nodes_fts'"
+        ).fetchone() is not None
         
         # Create tables
         self.conn.executescript("""
@@ -162,11 +441,20 @@ class SQLiteBackend(StorageBackend):
             -- Indexes for common queries
             CREATE INDEX IF NOT EXISTS idx_nodes_when ON nodes(when_ts);
             CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(type);
+            CREATE INDEX IF NOT EXISTS idx_nodes_type_when ON nodes(type, when_ts DESC);
             CREATE INDEX IF NOT EXISTS idx_nodes_created ON nodes(created_at);
             CREATE INDEX IF NOT EXISTS idx_nodes_project ON nodes(project);
             CREATE INDEX IF NOT EXISTS idx_nodes_scope ON nodes(scope);
-            CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source_id);
-            CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_id);
+            -- Import content hashes ("... hash:<hex>" in source); queries must
+            -- repeat these expressions verbatim for the index to be used
+            CREATE INDEX IF NOT EXISTS idx_nodes_content_hash
+                ON nodes(substr(source, instr(source, 'hash:') + 5))
+                WHERE instr(source, 'hash:') > 0;
+            -- Covering indexes for neighbor expansion in either direction
+            DROP INDEX IF EXISTS idx_edges_source;
+            DROP INDEX IF EXISTS idx_edges_target;
+            CREATE INDEX IF NOT EXISTS idx_edges_src ON edges(source_id, target_id, type);
+            CREATE INDEX IF NOT EXISTS idx_edges_tgt ON edges(target_id, source_id, type);
             CREATE INDEX IF NOT EXISTS idx_edges_type ON edges(type);
             
             -- Full-text search
@@ -193,6 +481,33 @@ class SQLiteBackend(StorageBackend):
                 INSERT INTO nodes_fts(rowid, what, why, how, tags)
                 VALUES (NEW.rowid, NEW.what, NEW.why, NEW.how, NEW.tags);
             END;
+            
+            -- Inverted tag index (tag -> node), kept in sync from the JSON array.
+            -- when_ts is denormalized so tag + time filters stay inside the index.
+            CREATE TABLE IF NOT EXISTS node_tags (
+                tag TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                when_ts TEXT,
+                PRIMARY KEY (tag, node_id)
+            ) WITHOUT ROWID;
+            
+            CREATE INDEX IF NOT EXISTS idx_node_tags_node ON node_tags(node_id);
+            CREATE INDEX IF NOT EXISTS idx_node_tags_when ON node_tags(tag, when_ts DESC);
+            
+            CREATE TRIGGER IF NOT EXISTS node_tags_ai AFTER INSERT ON nodes BEGIN
+                INSERT OR IGNORE INTO node_tags(tag, node_id, when_ts)
+                SELECT value, NEW.id, NEW.when_ts FROM json_each(NEW.tags);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS node_tags_ad AFTER DELETE ON nodes BEGIN
+                DELETE FROM node_tags WHERE node_id = OLD.id;
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS node_tags_au AFTER UPDATE OF tags, when_ts ON nodes BEGIN
+                DELETE FROM node_tags WHERE node_id = OLD.id;
+                INSERT OR IGNORE INTO node_tags(tag, node_id, when_ts)
+                SELECT value, NEW.id, NEW.when_ts FROM json_each(NEW.tags);
+            END;
         """)
         
         # Migration: Add project and scope columns if they don't exist
@@ -206,90 +521,127 @@ class SQLiteBackend(StorageBackend):
         except Exception:
             pass  # Column already exists
         
+        # Migration: Index the text of nodes stored before nodes_fts existed
+        if not had_fts:
+            self.conn.execute("INSERT INTO nodes_fts(nodes_fts) VALUES ('rebuild')")
+        
+        # Migration: Backfill the tag index for nodes stored before it existed
+        if version < 4:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO node_tags(tag, node_id, when_ts)
+                SELECT json_each.value, nodes.id, nodes.when_ts
+                FROM nodes, json_each(nodes.tags)
+                WHERE nodes.tags IS NOT NULL
+            """)
+        
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.conn.commit()
     
     def close(self) -> None:
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        shared, self._shared, self.conn = self._shared, None, None
+        if shared is None:
+            return
+        # The connection is shared - only the last backend using it closes it
+        shared.refs -= 1
+        if shared.refs == 0:
+            connections = _thread_connections()
+            for key, cached in list(connections.items()):
+                if cached is shared:
+                    del connections[key]
+            shared.conn.close()
     
-    def add_node(self, node: MemoryNode) -> UUID:
-        import json
+    def begin_batch(self) -> None:
+        """Open a write transaction; commits are deferred until end_batch().
         
-        self.conn.execute("""
-            INSERT INTO nodes (id, type, what, when_ts, where_ctx, who, why, how,
-                             project, scope, tags, artifacts, embedding, confidence, source,
-                             created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            str(node.id),
-            node.type.value,
-            node.what,
-            node.when.isoformat() if node.when else None,
-            node.where,
-            json.dumps(node.who),
-            node.why,
-            node.how,
-            node.project,
-            node.scope.value,
-            json.dumps(node.tags),
-            json.dumps(node.artifacts),
-            self._serialize_embedding(node.embedding),
-            node.confidence,
-            node.source,
-            node.created_at.isoformat(),
-            node.updated_at.isoformat()
-        ))
-        self.conn.commit()
+        Batches nest - only the outermost end_batch() commits.
+        """
+        if self._shared.batch_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._shared.batch_depth += 1
+    
+    def end_batch(self, rollback: bool = False) -> None:
+        """Close a batch opened by begin_batch(), committing (or rolling back) once."""
+        self._shared.batch_depth -= 1
+        if self._shared.batch_depth == 0:
+            if rollback:
+                self.conn.rollback()
+            else:
+                self.conn.commit()
+    
+    def _commit(self) -> None:
+        if self._shared.batch_depth == 0:
+            self.conn.commit()
+    
+    def add_node(self, node: MemoryNode) -> UUID:
+        self.conn.execute(_INSERT_NODE_SQL, self._node_params(node))
+        self._commit()
+        return node.id
+    
+    def add_node_with_edges(self, node: MemoryNode, edges: list[Edge]) -> UUID:
+        # One transaction and one commit for the node and all of its edges
+        self.begin_batch()
+        try:
+            self.conn.execute(_INSERT_NODE_SQL, self._node_params(node))
+            self.conn.executemany(_INSERT_EDGE_SQL, [self._edge_params(e) for e in edges])
+        except Exception:
+            self.end_batch(rollback=True)
+            raise
+        self.end_batch()
         return node.id
     
+    def add_nodes(self, nodes: list[MemoryNode]) -> list[UUID]:
+        self.conn.executemany(_INSERT_NODE_SQL, [self._node_params(n) for n in nodes])
+        self._commit()
+        return [node.id for node in nodes]
+    
     def get_node(self, node_id: UUID) -> Optional[MemoryNode]:
-        import json
-        from .models import NodeType
-        
-        row = self.conn.execute(
-            "SELECT * FROM nodes WHERE id = ?",
-            (str(node_id),)
-        ).fetchone()
+        row = self.conn.execute(_SELECT_NODE_SQL, (str(node_id),)).fetchone()
         
         if not row:
             return None
         
-        # Handle scope - default to BRANCH if not set (migration case)
-        scope_value = row['scope'] if 'scope' in row.keys() and row['scope'] else 'branch'
+        return self._row_to_node(row)
+    
+    def get_nodes(
+        self,
+        node_ids: Iterable[UUID],
+        limit: Optional[int] = None
+    ) -> dict[UUID, MemoryNode]:
+        ids = list(dict.fromkeys(str(nid) for nid in node_ids))
         
-        return MemoryNode(
-            id=UUID(row['id']),
-            type=NodeType(row['type']),
-            what=row['what'],
-            when=datetime.fromisoformat(row['when_ts']) if row['when_ts'] else None,
-            where=row['where_ctx'],
-            who=json.loads(row['who']) if row['who'] else [],
-            why=row['why'],
-            how=row['how'],
-            project=row['project'] if 'project' in row.keys() else None,
-            scope=KnowledgeScope(scope_value),
-            tags=json.loads(row['tags']) if row['tags'] else [],
-            artifacts=json.loads(row['artifacts']) if row['artifacts'] else [],
-            embedding=self._deserialize_embedding(row['embedding']),
-            confidence=row['confidence'],
-            source=row['source'],
-            created_at=datetime.fromisoformat(row['created_at']),
-            updated_at=datetime.fromisoformat(row['updated_at'])
-        )
+        query = "SELECT * FROM nodes WHERE id IN ({})"
+        params_tail = []
+        if limit is not None:
+            query += " ORDER BY when_ts DESC LIMIT ?"
+            params_tail.append(limit)
+        
+        # Chunk to stay under SQLite's default host parameter limit
+        rows = []
+        for i in range(0, len(ids), SQLITE_MAX_VARIABLES - 1):
+            chunk = ids[i:i + SQLITE_MAX_VARIABLES - 1]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self.conn.execute(
+                query.format(placeholders),
+                chunk + params_tail
+            ).fetchall())
+        
+        # Each chunk is already top-K; merge them before decoding anything
+        if limit is not None and len(ids) > SQLITE_MAX_VARIABLES - 1:
+            rows.sort(key=lambda row: row['when_ts'] or "", reverse=True)
+            rows = rows[:limit]
+        
+        nodes = {}
+        for row in rows:
+            node = self._row_to_node(row)
+            nodes[node.id] = node
+        return nodes
     
     def update_node(self, node: MemoryNode) -> bool:
         import json
         
         node.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
         
-        cursor = self.conn.execute("""
-            UPDATE nodes SET
-                type = ?, what = ?, when_ts = ?, where_ctx = ?, who = ?,
-                why = ?, how = ?, project = ?, scope = ?, tags = ?, artifacts = ?, embedding = ?,
-                confidence = ?, source = ?, updated_at = ?
-            WHERE id = ?
-        """, (
+        cursor = self.conn.execute(_UPDATE_NODE_SQL, (
             node.type.value,
             node.what,
             node.when.isoformat() if node.when else None,
@@ -307,152 +659,351 @@ class SQLiteBackend(StorageBackend):
             node.updated_at.isoformat(),
             str(node.id)
         ))
-        self.conn.commit()
+        self._commit()
         return cursor.rowcount > 0
     
     def delete_node(self, node_id: UUID) -> bool:
-        cursor = self.conn.execute(
-            "DELETE FROM nodes WHERE id = ?",
-            (str(node_id),)
-        )
-        self.conn.commit()
+        node_str = str(node_id)
+        cursor = self.conn.execute(_DELETE_NODE_SQL, (node_str,))
+        # Foreign keys aren't enforced, so drop the node's edges explicitly
+        self.conn.execute(_DELETE_NODE_EDGES_SQL, (node_str, node_str))
+        self._commit()
         return cursor.rowcount > 0
     
     def add_edge(self, edge: Edge) -> UUID:
-        import json
-        
-        self.conn.execute("""
-            INSERT INTO edges (id, source_id, target_id, type, weight, metadata, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            str(edge.id),
-            str(edge.source_id),
-            str(edge.target_id),
-            edge.type.value,
-            edge.weight,
-            json.dumps(edge.metadata),
-            edge.created_at.isoformat()
-        ))
-        self.conn.commit()
+        self.conn.execute(_INSERT_EDGE_SQL, self._edge_params(edge))
+        self._commit()
         return edge.id
     
+    def add_edges(self, edges: list[Edge]) -> list[UUID]:
+        self.conn.executemany(_INSERT_EDGE_SQL, [self._edge_params(e) for e in edges])
+        self._commit()
+        return [edge.id for edge in edges]
+    
     def get_edges(
         self,
         node_id: UUID,
         direction: str = "both",
         edge_type: Optional[EdgeType] = None
     ) -> list[Edge]:
-        import json
-        
         node_str = str(node_id)
         
-        if direction == "outgoing":
-            query = "SELECT * FROM edges WHERE source_id = ?"
-            params = [node_str]
-        elif direction == "incoming":
-            query = "SELECT * FROM edges WHERE target_id = ?"
+        if direction in ("outgoing", "incoming"):
             params = [node_str]
         else:  # both
-            query = "SELECT * FROM edges WHERE source_id = ? OR target_id = ?"
+            direction = "both"
             params = [node_str, node_str]
         
         if edge_type:
-            query += " AND type = ?"
+            query = _SELECT_EDGES_BY_TYPE_SQL[direction]
             params.append(edge_type.value)
+        else:
+            query = _SELECT_EDGES_SQL[direction]
         
         rows = self.conn.execute(query, params).fetchall()
         
+        return [self._row_to_edge(row) for row in rows]
+    
+    def get_edges_bulk(
+        self,
+        node_ids: Iterable[UUID],
+        direction: str = "both"
+    ) -> dict[UUID, list[Edge]]:
+        ids = list(dict.fromkeys(str(nid) for nid in node_ids))
+        
+        # As in get_neighbors, one query per direction so each uses its index
+        queries = []
+        if direction in ("outgoing", "both"):
+            queries.append(("source_id", "SELECT * FROM edges WHERE source_id IN ({})"))
+        if direction in ("incoming", "both"):
+            queries.append(("target_id", "SELECT * FROM edges WHERE target_id IN ({})"))
+        
+        edges_by_node: dict[UUID, list[Edge]] = {}
+        for i in range(0, len(ids), SQLITE_MAX_VARIABLES):
+            chunk = ids[i:i + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            for key, query in queries:
+                for row in self.conn.execute(query.format(placeholders), chunk):
+                    # A self-loop matches both queries but is one edge
+                    if key == "target_id" and direction == "both" and row['source_id'] == row['target_id']:
+                        continue
+                    edges_by_node.setdefault(UUID(row[key]), []).append(self._row_to_edge(row))
+        
+        return edges_by_node
+    
+    def get_edges_with_endpoints(self, node_id: UUID) -> list[tuple[Edge, MemoryNode]]:
+        """Get every edge touching a node, each paired with the node at its other end.
+        
+        One joined query instead of get_edges() followed by a node lookup.
+        Edges whose other endpoint no longer exists are left out.
+        """
+        import json
+        
+        node_str = str(node_id)
+        rows = self.conn.execute(
+            _SELECT_EDGES_WITH_ENDPOINTS_SQL, (node_str, node_str, node_str)
+        ).fetchall()
+        
         return [
-            Edge(
-                id=UUID(row['id']),
-                source_id=UUID(row['source_id']),
-                target_id=UUID(row['target_id']),
-                type=EdgeType(row['type']),
-                weight=row['weight'],
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                created_at=datetime.fromisoformat(row['created_at'])
+            (
+                Edge(
+                    id=UUID(row['edge_id']),
+                    source_id=UUID(row['source_id']),
+                    target_id=UUID(row['target_id']),
+                    type=_EDGE_TYPES[row['edge_type']],
+                    weight=row['weight'],
+                    metadata=json.loads(row['metadata']) if row['metadata'] else {},
+                    created_at=datetime.fromisoformat(row['edge_created_at'])
+                ),
+                self._row_to_node(row),
             )
             for row in rows
         ]
     
+    def get_neighbors(
+        self,
+        node_ids: Iterable[UUID],
+        direction: str = "both",
+        edge_types: Optional[list[EdgeType]] = None
+    ) -> list[tuple[UUID, UUID]]:
+        # The frontier side of each row is one of the inputs, so reuse those
+        # UUIDs; only the far side needs parsing
+        by_str = {str(nid): nid for nid in node_ids}
+        ids = list(by_str)
+        type_values = [t.value for t in edge_types] if edge_types else []
+        type_clause = ""
+        if type_values:
+            type_clause = f" AND type IN ({','.join('?' * len(type_values))})"
+        
+        # Each direction is its own query so both can use their index
+        queries = []
+        if direction in ("outgoing", "both"):
+            queries.append("SELECT source_id, target_id FROM edges WHERE source_id IN ({})")
+        if direction in ("incoming", "both"):
+            queries.append("SELECT target_id, source_id FROM edges WHERE target_id IN ({})")
+        
+        pairs = []
+        chunk_size = SQLITE_MAX_VARIABLES - len(type_values)
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            for query in queries:
+                rows = self.conn.execute(
+                    query.format(placeholders) + type_clause,
+                    chunk + type_values
+                ).fetchall()
+                pairs.extend((by_str[row[0]], UUID(row[1])) for row in rows)
+        
+        return pairs
+    
     def delete_edge(self, edge_id: UUID) -> bool:
-        cursor = self.conn.execute(
-            "DELETE FROM edges WHERE id = ?",
-            (str(edge_id),)
-        )
-        self.conn.commit()
+        cursor = self.conn.execute(_DELETE_EDGE_SQL, (str(edge_id),))
+        self._commit()
         return cursor.rowcount > 0
     
-    def query_by_time(
+    def resolve_id_prefix(self, prefix: str, limit: int = 2) -> list[UUID]:
+        """Find node IDs starting with prefix (e.g. a short ID from the CLI).
+        
+        Matches on an explicit primary key range [prefix, next prefix). A
+        bound GLOB/LIKE pattern only gets that range through SQLite's
+        pattern optimization, which re-prepares the statement per value.
+        """
+        prefix = prefix.lower()
+        if not prefix or prefix.strip(_UUID_CHARS):
+            return []
+        # Smallest string above every ID with this prefix: bump the last char
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self.conn.execute(
+            "SELECT id FROM nodes WHERE id >= ? AND id < ? LIMIT ?",
+            (prefix, upper, limit)
+        ).fetchall()
+        return [UUID(row[0]) for row in rows]
+    
+    def query_nodes(
         self,
+        node_type: Optional[NodeType] = None,
+        tags: Optional[list[str]] = None,
+        match_all: bool = False,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
         limit: int = 100
     ) -> list[MemoryNode]:
-        query = "SELECT id FROM nodes WHERE 1=1"
-        params = []
+        """Find nodes matching type, tag and time filters, newest first.
+        
+        All predicates are applied in SQL so rows that don't match are never
+        decoded.
         
+        Args:
+            node_type: Only return nodes of this type
+            tags: Only return nodes with any (or all, see match_all) of these tags
+            match_all: Require every tag in `tags` to be present
+            since: Only nodes at or after this time
+            until: Only nodes at or before this time
+            limit: Maximum results
+        """
+        unique_tags = list(dict.fromkeys(tags)) if tags else []
+        
+        if len(unique_tags) == 1:
+            # Walk the tag's (tag, when_ts) index newest first and stop at the
+            # limit, rather than collecting every tagged node and sorting
+            query = (
+                "SELECT nodes.* FROM node_tags CROSS JOIN nodes"
+                " ON nodes.id = node_tags.node_id WHERE node_tags.tag = ?"
+            )
+            params: list = [unique_tags[0]]
+            when_col = "node_tags.when_ts"
+        else:
+            query = "SELECT * FROM nodes WHERE 1=1"
+            params = []
+            when_col = "when_ts"
+        
+        if node_type:
+            query += " AND type = ?"
+            params.append(node_type.value)
         if since:
-            query += " AND when_ts >= ?"
+            query += f" AND {when_col} >= ?"
             params.append(since.isoformat())
         if until:
-            query += " AND when_ts <= ?"
+            query += f" AND {when_col} <= ?"
             params.append(until.isoformat())
+        if len(unique_tags) > 1:
+            placeholders = ",".join("?" * len(unique_tags))
+            query += f" AND id IN (SELECT node_id FROM node_tags WHERE tag IN ({placeholders})"
+            params.extend(unique_tags)
+            # Repeat the time bounds so the (tag, when_ts) index prunes candidates
+            if since:
+                query += " AND when_ts >= ?"
+                params.append(since.isoformat())
+            if until:
+                query += " AND when_ts <= ?"
+                params.append(until.isoformat())
+            if match_all:
+                query += " GROUP BY node_id HAVING COUNT(*) = ?"
+                params.append(len(unique_tags))
+            query += ")"
         
-        query += " ORDER BY when_ts DESC LIMIT ?"
+        query += f" ORDER BY {when_col} DESC LIMIT ?"
         params.append(limit)
         
         rows = self.conn.execute(query, params).fetchall()
-        return [self.get_node(UUID(row['id'])) for row in rows]
+        return [self._row_to_node(row) for row in rows]
+    
+    def iter_nodes(
+        self,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[MemoryNode]:
+        """Yield nodes newest first, decoding each row only as it is consumed.
+        
+        Unlike query_by_time the result is never held in memory as a whole,
+        so it suits exports of the entire graph.
+        """
+        query = "SELECT * FROM nodes"
+        params: list = []
+        if since:
+            query += " WHERE when_ts >= ?"
+            params.append(since.isoformat())
+        query += " ORDER BY when_ts DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        
+        for row in self.conn.execute(query, params):
+            yield self._row_to_node(row)
+    
+    def iter_export_rows(
+        self,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[sqlite3.Row]:
+        """Yield newest-first rows for the markdown export.
+        
+        Rows carry id, type, what, where_ctx, why and how as stored, plus
+        when_min ("YYYY-MM-DD HH:MM") and tags_csv/who_csv (", "-joined, NULL
+        when empty). No MemoryNode or JSON decode happens per row.
+        """
+        where = "WHERE when_ts >= ?" if since else ""
+        params = [since.isoformat()] if since else []
+        params.append(-1 if limit is None else limit)
+        
+        yield from self.conn.execute(_NODE_EXPORT_ROW_SQL.format(where=where), params)
+    
+    def count_nodes(self, since: Optional[datetime] = None) -> int:
+        """Count nodes, optionally only those at or after `since`."""
+        if since:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM nodes WHERE when_ts >= ?", (since.isoformat(),)
+            ).fetchone()
+        else:
+            row = self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()
+        return row[0]
+    
+    def query_by_time(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100
+    ) -> list[MemoryNode]:
+        return self.query_nodes(since=since, until=until, limit=limit)
     
     def query_by_tags(
         self,
         tags: list[str],
         match_all: bool = False,
-        limit: int = 100
+        limit: int = 100,
+        since: Optional[datetime] = None
     ) -> list[MemoryNode]:
-        # Simple implementation - can optimize with JSON functions
-        all_nodes = self.conn.execute(
-            "SELECT id, tags FROM nodes LIMIT ?",
-            (limit * 10,)  # Over-fetch then filter
-        ).fetchall()
-        
-        import json
-        results = []
-        for row in all_nodes:
-            node_tags = set(json.loads(row['tags']) if row['tags'] else [])
-            search_tags = set(tags)
-            
-            if match_all:
-                if search_tags.issubset(node_tags):
-                    results.append(UUID(row['id']))
-            else:
-                if search_tags & node_tags:
-                    results.append(UUID(row['id']))
-            
-            if len(results) >= limit:
-                break
-        
-        return [self.get_node(nid) for nid in results]
+        if not tags and not match_all:
+            # Any of no tags matches nothing; query_nodes would read an empty
+            # list as "no tag filter"
+            return []
+        return self.query_nodes(tags=tags, match_all=match_all, since=since, limit=limit)
     
     def query_by_text(
         self,
         query: str,
         limit: int = 100
     ) -> list[MemoryNode]:
-        # Quote the query to handle special characters like hyphens in FTS5
-        # Without quoting, "self-hosted" is parsed as "self" MINUS "hosted"
-        # which causes "no such column: hosted" error
+        return self.query_by_text_filtered(query, limit=limit)
+    
+    def query_by_text_json(
+        self,
+        query: str,
+        limit: int = 100
+    ) -> list[str]:
+        """Full-text search returning each match as a JSON object string.
+        
+        Same matches and order as query_by_text, but SQLite assembles the
+        JSON so rows are never decoded into MemoryNodes and re-encoded.
+        """
         escaped_query = '"' + query.replace('"', '""') + '"'
         
-        rows = self.conn.execute("""
-            SELECT nodes.id FROM nodes
-            JOIN nodes_fts ON nodes.rowid = nodes_fts.rowid
+        rows = self.conn.execute(f"""
+            SELECT {_NODE_SUMMARY_JSON} FROM nodes_fts
+            JOIN nodes ON nodes.rowid = nodes_fts.rowid
             WHERE nodes_fts MATCH ?
+            ORDER BY bm25(nodes_fts)
             LIMIT ?
         """, (escaped_query, limit)).fetchall()
         
-        return [self.get_node(UUID(row['id'])) for row in rows]
+        return [row[0] for row in rows]
+    
+    def export_nodes_json(
+        self,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[str]:
+        """Yield the newest nodes (optionally since a time) as JSON object strings.
+        
+        Each object carries the node's fields plus an "edges" list of
+        {target, type} for every edge touching it. SQLite assembles the JSON,
+        so no MemoryNode, Edge or intermediate dict is built per record, and
+        rows are read from the cursor as they are consumed.
+        """
+        where = "WHERE when_ts >= ?" if since else ""
+        params = [since.isoformat()] if since else []
+        params.append(-1 if limit is None else limit)
+        
+        for row in self.conn.execute(_NODE_EXPORT_JSON_SQL.format(where=where), params):
+            yield row[0]
     
     def query_by_embedding(
         self,
@@ -515,11 +1066,15 @@ class SQLiteBackend(StorageBackend):
             roots_only: Only return root-scoped nodes
             limit: Maximum results
         """
+        # Quote the query to handle special characters like hyphens in FTS5
+        # Without quoting, "self-hosted" is parsed as "self" MINUS "hosted"
+        # which causes "no such column: hosted" error
         escaped_query = '"' + query.replace('"', '""') + '"'
         
+        # Best matches first; rows come back whole so there's no per-ID refetch
         sql = """
-            SELECT nodes.id FROM nodes
-            JOIN nodes_fts ON nodes.rowid = nodes_fts.rowid
+            SELECT nodes.* FROM nodes_fts
+            JOIN nodes ON nodes.rowid = nodes_fts.rowid
             WHERE nodes_fts MATCH ?
         """
         params = [escaped_query]
@@ -530,11 +1085,11 @@ class SQLiteBackend(StorageBackend):
             sql += " AND (nodes.project = ? OR nodes.scope = 'root')"
             params.append(project)
         
-        sql += " LIMIT ?"
+        sql += " ORDER BY bm25(nodes_fts) LIMIT ?"
         params.append(limit)
         
         rows = self.conn.execute(sql, params).fetchall()
-        return [self.get_node(UUID(row['id'])) for row in rows]
+        return [self._row_to_node(row) for row in rows]
     
     def get_all_projects(self) -> list[str]:
         """Get a list of all unique project names (trees)."""
@@ -589,6 +1144,133 @@ class SQLiteBackend(StorageBackend):
             'orphan_roots': orphan_roots,
         }
     
+    def get_graph_stats(self, top_n: int = 5) -> dict:
+        """Get node/edge counts for the whole graph, computed in SQL.
+        
+        Returns dict with:
+            - node_count: total number of nodes
+            - node_types: {node type value: count}
+            - edge_types: {edge type value: count}
+            - min_date / max_date: earliest and latest node time (or None)
+            - most_connected: [(node_id, edge count)] for the top_n nodes by degree
+        """
+        node_types = {
+            row['type']: row['cnt']
+            for row in self.conn.execute(
+                "SELECT type, COUNT(*) as cnt FROM nodes GROUP BY type"
+            )
+        }
+        edge_types = {
+            row['type']: row['cnt']
+            for row in self.conn.execute(
+                "SELECT type, COUNT(*) as cnt FROM edges GROUP BY type"
+            )
+        }
+        # Separate MIN and MAX subqueries are each one index seek; together
+        # in one SELECT they scan the whole when_ts index
+        dates = self.conn.execute("""
+            SELECT
+                (SELECT MIN(when_ts) FROM nodes) as min_ts,
+                (SELECT MAX(when_ts) FROM nodes) as max_ts
+        """).fetchone()
+        # Degree per endpoint is counted off the (already sorted) edge
+        # indexes, so only one row per node - not per edge end - is sorted
+        most_connected = [
+            (UUID(row['node_id']), row['cnt'])
+            for row in self.conn.execute("""
+                SELECT node_id, SUM(cnt) as cnt FROM (
+                    SELECT source_id AS node_id, COUNT(*) as cnt FROM edges GROUP BY source_id
+                    UNION ALL
+                    SELECT target_id, COUNT(*) FROM edges GROUP BY target_id
+                )
+                GROUP BY node_id
+                ORDER BY cnt DESC
+                LIMIT ?
+            """, (top_n,))
+        ]
+        
+        return {
+            'node_count': sum(node_types.values()),
+            'node_types': node_types,
+            'edge_types': edge_types,
+            'min_date': datetime.fromisoformat(dates['min_ts']) if dates['min_ts'] else None,
+            'max_date': datetime.fromisoformat(dates['max_ts']) if dates['max_ts'] else None,
+            'most_connected': most_connected,
+        }
+    
+    def _node_params(self, node: MemoryNode) -> tuple:
+        import json
+        
+        return (
+            str(node.id),
+            node.type.value,
+            node.what,
+            node.when.isoformat() if node.when else None,
+            node.where,
+            json.dumps(node.who),
+            node.why,
+            node.how,
+            node.project,
+            node.scope.value,
+            json.dumps(node.tags),
+            json.dumps(node.artifacts),
+            self._serialize_embedding(node.embedding),
+            node.confidence,
+            node.source,
+            node.created_at.isoformat(),
+            node.updated_at.isoformat()
+        )
+    
+    def _edge_params(self, edge: Edge) -> tuple:
+        import json
+        
+        return (
+            str(edge.id),
+            str(edge.source_id),
+            str(edge.target_id),
+            edge.type.value,
+            edge.weight,
+            json.dumps(edge.metadata),
+            edge.created_at.isoformat()
+        )
+    
+    def _row_to_edge(self, row) -> Edge:
+        import json
+        
+        return Edge(
+            id=UUID(row['id']),
+            source_id=UUID(row['source_id']),
+            target_id=UUID(row['target_id']),
+            type=_EDGE_TYPES[row['type']],
+            weight=row['weight'],
+            metadata=json.loads(row['metadata']) if row['metadata'] else {},
+            created_at=datetime.fromisoformat(row['created_at'])
+        )
+    
+    def _row_to_node(self, row) -> MemoryNode:
+        # Handle scope - default to BRANCH if not set (migration case)
+        scope_value = row['scope'] if 'scope' in row.keys() and row['scope'] else 'branch'
+        
+        return MemoryNode(
+            id=UUID(row['id']),
+            type=_NODE_TYPES[row['type']],
+            what=row['what'],
+            when=datetime.fromisoformat(row['when_ts']) if row['when_ts'] else None,
+            where=row['where_ctx'],
+            who=_loads_list(row['who']) if row['who'] else [],
+            why=row['why'],
+            how=row['how'],
+            project=row['project'] if 'project' in row.keys() else None,
+            scope=_SCOPES[scope_value],
+            tags=_loads_list(row['tags']) if row['tags'] else [],
+            artifacts=_loads_list(row['artifacts']) if row['artifacts'] else [],
+            embedding=self._deserialize_embedding(row['embedding']),
+            confidence=row['confidence'],
+            source=row['source'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            updated_at=datetime.fromisoformat(row['updated_at'])
+        )
+    
     def _serialize_embedding(self, embedding: Optional[list[float]]) -> Optional[bytes]:
         if embedding is None:
             return None
@@ -10,6 +10,24 @@ from uuid import UUID
 
 from engram.core import SQLiteBackend, MemoryNode
 
+# Rows per executemany() when bulk-inserting imported nodes
+IMPORT_BATCH_SIZE = 1000
+
+# The hash follows "hash:" at the end of `source`. These expressions must match
+# idx_nodes_content_hash in the storage schema exactly for SQLite to use it.
+_SELECT_BY_HASH_SQL = """
+    SELECT id FROM nodes
+    WHERE instr(source, 'hash:') > 0
+      AND substr(source, instr(source, 'hash:') + 5) = ?
+    LIMIT 1
+"""
+
+_SELECT_HASHES_SQL = """
+    SELECT id, substr(source, instr(source, 'hash:') + 5)
+    FROM nodes
+    WHERE instr(source, 'hash:') > 0
+"""
+
 
 def content_hash(what: str, when: Optional[str] = None, source: Optional[str] = None) -> str:
     """
@@ -21,6 +39,9 @@ def content_hash(what: str, when: Optional[str] = None, source: Optional[str] =
     - source: Source identifier (e.g., "git:abc123" or "md:file.md")
     
     Returns a hex string that can be used to detect duplicates.
+    
+    Hashes are stored with imported nodes, so changing the algorithm would
+    make every re-import miss its earlier copy.
     """
     parts = [what.strip()]
     if when:
@@ -40,16 +61,26 @@ def check_duplicate(storage: SQLiteBackend, content_hash_value: str) -> Optional
     
     We store the content hash in the node's `source` field with a "hash:" prefix.
     """
-    # Query nodes that might be duplicates
-    # We use a convention: source field contains "hash:{hash}" 
+    # Matches idx_nodes_content_hash, so this is an index lookup, not a scan
     cursor = storage.conn.execute(
-        "SELECT id FROM nodes WHERE source LIKE ?",
-        (f"%hash:{content_hash_value}%",)
+        _SELECT_BY_HASH_SQL,
+        (content_hash_value,)
     )
     row = cursor.fetchone()
     return UUID(row['id']) if row else None
 
 
+def fetch_content_hashes(storage: SQLiteBackend) -> dict[str, UUID]:
+    """
+    Load every stored content hash with its node ID in one query.
+    
+    Lets bulk imports check for duplicates with a dict lookup instead of a
+    LIKE scan per node.
+    """
+    cursor = storage.conn.execute(_SELECT_HASHES_SQL)
+    return {hash_value: UUID(node_id) for node_id, hash_value in cursor}
+
+
 def add_node_with_dedup(
     storage: SQLiteBackend,
     node: MemoryNode,
@@ -76,3 +107,59 @@ def add_node_with_dedup(
     
     node_id = storage.add_node(node)
     return node_id, True
+
+
+def add_nodes_with_dedup(
+    storage: SQLiteBackend,
+    nodes: list[MemoryNode],
+    hash_values: list[str],
+    known_hashes: Optional[dict[str, UUID]] = None,
+) -> list[tuple[UUID, bool]]:
+    """
+    Batch version of add_node_with_dedup().
+    
+    New nodes are inserted with executemany() in blocks of IMPORT_BATCH_SIZE
+    inside a single transaction. Repeats within `nodes` are caught as well as
+    nodes already in storage.
+    
+    Pass `known_hashes` from fetch_content_hashes() to share one prefetch
+    across several calls; it is updated with the nodes added here.
+    
+    Returns a (node_id, was_new) tuple per input node, in order.
+    """
+    if known_hashes is None:
+        known_hashes = fetch_content_hashes(storage)
+    
+    results = []
+    pending: list[MemoryNode] = []
+    
+    storage.begin_batch()
+    try:
+        for node, hash_value in zip(nodes, hash_values):
+            existing = known_hashes.get(hash_value)
+            if existing:
+                results.append((existing, False))
+                continue
+            
+            # Add hash to source
+            if node.source:
+                node.source = f"{node.source} hash:{hash_value}"
+            else:
+                node.source = f"hash:{hash_value}"
+            
+            known_hashes[hash_value] = node.id
+            pending.append(node)
+            results.append((node.id, True))
+            
+            if len(pending) >= IMPORT_BATCH_SIZE:
+                storage.add_nodes(pending)
+                pending = []
+        
+        if pending:
+            storage.add_nodes(pending)
+    except Exception:
+        storage.end_batch(rollback=True)
+        raise
+    storage.end_batch()
+    
+    return results
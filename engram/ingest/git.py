@@ -4,16 +4,63 @@ Git commit ingestion for Engram.
 Scans git log and creates memory nodes for significant commits.
 """
 
+import functools
+import os
 import re
 import subprocess
+import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 from uuid import UUID
 
 from engram.core import MemoryNode, Edge, EdgeType, NodeType, SQLiteBackend
-from .dedup import content_hash, add_node_with_dedup
+from .dedup import IMPORT_BATCH_SIZE, content_hash, add_nodes_with_dedup
+
+# Node type per conventional commit type; anything else is an EVENT
+_COMMIT_TYPE_NODE_TYPES = {
+    "feat": NodeType.ARTIFACT,
+    "feature": NodeType.ARTIFACT,
+    "fix": NodeType.EVENT,
+    "bugfix": NodeType.EVENT,
+    "refactor": NodeType.ARTIFACT,
+    "perf": NodeType.ARTIFACT,
+    "docs": NodeType.ARTIFACT,
+    "doc": NodeType.ARTIFACT,
+    "test": NodeType.ARTIFACT,
+    "tests": NodeType.ARTIFACT,
+    "decision": NodeType.DECISION,
+}
+
+# File-type tag per extension; other files containing "test" are tagged "testing"
+_EXTENSION_TAGS = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "javascript",
+    ".cs": "csharp",
+    ".csproj": "csharp",
+    ".md": "docs",
+    ".yml": "ci",
+    ".yaml": "ci",
+}
+
+# Conventional commit prefix: "type:" or "type(scope):"
+_COMMIT_TYPE_RE = re.compile(r"^(\w+)(?:\([^)]+\))?:")
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_patterns(patterns: tuple[str, ...], flags: int = 0) -> re.Pattern:
+    """
+    Fuse a filter's pattern list into one alternation, compiled once per
+    distinct list rather than per commit.
+    
+    The result matches wherever any of the patterns would; an empty list
+    gives a pattern that never matches.
+    """
+    if not patterns:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
 
 
 @dataclass
@@ -35,7 +82,8 @@ class CommitFilter:
         r"^chore: Bump version",
     ])
     
-    # Significant patterns (always include)
+    # Significant patterns (always include). Nothing that passes the filters
+    # above is dropped, so this and significant_files don't change the result
     significant_patterns: list[str] = field(default_factory=lambda: [
         r"^feat:",
         r"^fix:",
@@ -81,23 +129,36 @@ class GitCommit:
     @property
     def commit_type(self) -> Optional[str]:
         """Extract conventional commit type (feat, fix, etc.)."""
-        match = re.match(r"^(\w+)(?:\([^)]+\))?:", self.message)
+        match = _COMMIT_TYPE_RE.match(self.message)
         return match.group(1) if match else None
 
 
-def parse_git_log(repo_path: Path, filter_config: CommitFilter) -> list[GitCommit]:
-    """
-    Parse git log from a repository.
-    
-    Returns list of GitCommit objects.
-    """
+# One record per commit: a record separator, then NUL-terminated hash, author,
+# strict ISO date and subject. With -z, --name-only file names follow NUL-terminated.
+# No field can contain NUL, so subjects with "|" or odd characters parse cleanly.
+_LOG_RECORD_FORMAT = "%x1e%H%x00%an%x00%aI%x00%s%x00"
+_LOG_READ_SIZE = 65536
+
+
+def _git_log_command(
+    repo_path: Path,
+    filter_config: CommitFilter,
+    name_only: bool = True,
+) -> list[str]:
+    """Build the git log command shared by iter_git_log and count_git_commits."""
     cmd = [
         "git", "-C", str(repo_path),
         "log",
-        "--format=%H|%an|%ai|%s",
-        "--name-only",
+        "-z",
+        f"--format={_LOG_RECORD_FORMAT}",
     ]
     
+    if name_only:
+        cmd.append("--name-only")
+    # Let git drop true merges before they reach the pipe; subjects starting
+    # with "Merge" are still filtered in _is_filtered_out
+    if filter_config.skip_merge:
+        cmd.append("--no-merges")
     if filter_config.since:
         cmd.append(f"--since={filter_config.since.isoformat()}")
     if filter_config.until:
@@ -105,81 +166,144 @@ def parse_git_log(repo_path: Path, filter_config: CommitFilter) -> list[GitCommi
     if filter_config.max_commits > 0:
         cmd.append(f"-n{filter_config.max_commits * 2}")  # Over-fetch to account for filtering
     
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    
-    commits = []
-    current_commit = None
+    return cmd
+
+
+def _iter_log_records(cmd: list[str]) -> Iterator[list[str]]:
+    """
+    Run a git log command built by _git_log_command and yield each commit's
+    fields: hash, author, date, subject, then any file names.
     
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            # Empty line separates commits
-            if current_commit:
-                commits.append(current_commit)
-            current_commit = None
-            continue
+    Output is read from the pipe in blocks, so the whole log is never held
+    in memory and parsing overlaps with git walking the history.
+    """
+    # git re-encodes messages to UTF-8 but prints -z paths as raw bytes, which
+    # need not be valid UTF-8; replace those rather than fail the import.
+    # stderr goes to a file: a pipe nobody reads until stdout ends would block
+    # git (and so this loop) once its warnings fill the pipe buffer.
+    with tempfile.TemporaryFile() as stderr_file, subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=stderr_file,
+        encoding="utf-8",
+        errors="replace",
+    ) as proc:
+        pending = ""
+        while chunk := proc.stdout.read(_LOG_READ_SIZE):
+            records = (pending + chunk).split("\x1e")
+            pending = records.pop()
+            for record in records:
+                if record:
+                    yield _split_log_record(record)
+        if pending:
+            yield _split_log_record(pending)
         
-        if "|" in line and len(line.split("|")) == 4:
-            # New commit line
-            if current_commit:
-                commits.append(current_commit)
-            
-            parts = line.split("|")
-            commit_hash, author, date_str, message = parts
-            
-            # Parse date
-            try:
-                commit_date = datetime.fromisoformat(date_str.replace(" -", "-").replace(" +", "+"))
-                commit_date = commit_date.replace(tzinfo=None)  # Strip timezone for consistency
-            except ValueError:
-                commit_date = datetime.now()
-            
-            current_commit = GitCommit(
-                hash=commit_hash,
-                author=author,
-                date=commit_date,
-                message=message,
-                files=[],
-            )
-        elif current_commit and line.strip():
-            # File name
-            current_commit.files.append(line.strip())
-    
-    # Don't forget the last commit
-    if current_commit:
-        commits.append(current_commit)
-    
-    return commits
+        if proc.wait():
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
 
 
-def is_significant(commit: GitCommit, filter_config: CommitFilter) -> bool:
+def _split_log_record(record: str) -> list[str]:
+    """Split one log record into its header fields and file names."""
+    # git puts a newline before the file list; empty strings are terminators
+    fields = record.split("\0")
+    return fields[:4] + [name.lstrip("\n") for name in fields[4:] if name.strip("\n")]
+
+
+def iter_git_log(repo_path: Path, filter_config: CommitFilter) -> Iterator[GitCommit]:
     """
-    Determine if a commit is significant enough to import.
+    Yield commits from a repository's git log as git produces them.
     """
-    message = commit.message
+    cmd = _git_log_command(repo_path, filter_config)
+    
+    for commit_hash, author, date_str, message, *files in _iter_log_records(cmd):
+        # %aI is strict ISO 8601
+        try:
+            commit_date = datetime.fromisoformat(date_str)
+            commit_date = commit_date.replace(tzinfo=None)  # Strip timezone for consistency
+        except ValueError:
+            commit_date = datetime.now()
+        
+        yield GitCommit(
+            hash=commit_hash,
+            author=author,
+            date=commit_date,
+            message=message,
+            files=files,
+        )
+
+
+def parse_git_log(repo_path: Path, filter_config: CommitFilter) -> list[GitCommit]:
+    """
+    Parse git log from a repository.
     
+    Returns list of GitCommit objects. Use iter_git_log() to avoid holding
+    them all at once.
+    """
+    return list(iter_git_log(repo_path, filter_config))
+
+
+def _is_filtered_out(message: str, filter_config: CommitFilter) -> bool:
+    """Check the merge and trivial-message filters for a commit subject."""
     # Always skip merge commits if configured
     if filter_config.skip_merge and message.startswith("Merge"):
-        return False
+        return True
     
     # Check trivial patterns
     if filter_config.skip_trivial:
-        for pattern in filter_config.trivial_patterns:
-            if re.match(pattern, message, re.IGNORECASE):
-                return False
-    
-    # Check significant patterns - always include
-    for pattern in filter_config.significant_patterns:
-        if re.match(pattern, message, re.IGNORECASE):
+        trivial = _compile_patterns(tuple(filter_config.trivial_patterns), re.IGNORECASE)
+        if trivial.match(message):
             return True
     
-    # Check significant files
-    for file in commit.files:
-        for pattern in filter_config.significant_files:
-            if re.search(pattern, file):
-                return True
+    return False
+
+
+def is_significant(commit: GitCommit, filter_config: CommitFilter) -> bool:
+    """
+    Determine if a commit is significant enough to import.
     
-    # Default: include if not filtered out
-    return True
+    Every commit that gets past the merge and trivial filters is imported.
+    significant_patterns and significant_files can only vouch for a commit
+    that would be kept anyway, so they are not evaluated.
+    """
+    return not _is_filtered_out(commit.message, filter_config)
+
+
+def count_git_commits(repo_path: Path, filter_config: CommitFilter) -> tuple[int, int]:
+    """
+    Count scanned and significant commits without parsing changed files.
+    
+    Streams only the commit header lines, so a dry run over a large history
+    skips the per-commit tree diff that --name-only requires. Significant
+    patterns and files can only promote a commit that is already included
+    by default, so the subject filters alone decide significance.
+    
+    Returns (total_commits, significant_commits) matching import_git_repo.
+    """
+    cmd = _git_log_command(repo_path, filter_config, name_only=False)
+    
+    total = 0
+    significant = 0
+    
+    for fields in _iter_log_records(cmd):
+        total += 1
+        if not _is_filtered_out(fields[3], filter_config):
+            significant += 1
+    
+    if filter_config.max_commits > 0:
+        significant = min(significant, filter_config.max_commits)
+    
+    return total, significant
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_type_tag(path: str) -> Optional[str]:
+    """File-type tag for a changed path, cached since paths recur across history."""
+    tag = _EXTENSION_TAGS.get(os.path.splitext(path)[1])
+    if tag is None and "test" in path.lower():
+        tag = "testing"
+    return tag
 
 
 def commit_to_node(commit: GitCommit, repo_name: str) -> MemoryNode:
@@ -188,21 +312,7 @@ def commit_to_node(commit: GitCommit, repo_name: str) -> MemoryNode:
     """
     # Determine node type from conventional commit prefix
     commit_type = commit.commit_type
-    
-    if commit_type in ("feat", "feature"):
-        node_type = NodeType.ARTIFACT
-    elif commit_type in ("fix", "bugfix"):
-        node_type = NodeType.EVENT
-    elif commit_type in ("refactor", "perf"):
-        node_type = NodeType.ARTIFACT
-    elif commit_type in ("docs", "doc"):
-        node_type = NodeType.ARTIFACT
-    elif commit_type in ("test", "tests"):
-        node_type = NodeType.ARTIFACT
-    elif commit_type == "decision":
-        node_type = NodeType.DECISION
-    else:
-        node_type = NodeType.EVENT
+    node_type = _COMMIT_TYPE_NODE_TYPES.get(commit_type, NodeType.EVENT)
     
     # Build tags from commit type, repo, and file types
     tags = [repo_name]
@@ -210,21 +320,10 @@ def commit_to_node(commit: GitCommit, repo_name: str) -> MemoryNode:
         tags.append(commit_type)
     
     # Add file-based tags
-    file_types = set()
     for file in commit.files:
-        if file.endswith(".py"):
-            file_types.add("python")
-        elif file.endswith((".js", ".ts")):
-            file_types.add("javascript")
-        elif file.endswith((".cs", ".csproj")):
-            file_types.add("csharp")
-        elif file.endswith(".md"):
-            file_types.add("docs")
-        elif file.endswith((".yml", ".yaml")):
-            file_types.add("ci")
-        elif "test" in file.lower():
-            file_types.add("testing")
-    tags.extend(file_types)
+        tag = _file_type_tag(file)
+        if tag:
+            tags.append(tag)
     
     # Build what/how fields
     what = commit.message
@@ -238,7 +337,7 @@ def commit_to_node(commit: GitCommit, repo_name: str) -> MemoryNode:
         when=commit.date,
         who=[commit.author],
         how=how,
-        tags=list(set(tags)),
+        tags=list(dict.fromkeys(tags)),
         source=f"git:{repo_name}:{commit.short_hash}",
     )
 
@@ -268,70 +367,93 @@ def import_git_repo(
     
     repo_name = repo_path.name
     
-    # Parse commits
-    all_commits = parse_git_log(repo_path, filter_config)
-    
-    # Filter to significant commits
-    significant = [c for c in all_commits if is_significant(c, filter_config)]
-    
-    # Apply max limit
-    if filter_config.max_commits > 0:
-        significant = significant[:filter_config.max_commits]
+    if dry_run:
+        # Counts only: no file lists, no nodes
+        total, significant_count = count_git_commits(repo_path, filter_config)
+        return {
+            "total_commits": total,
+            "significant_commits": significant_count,
+            "nodes_created": 0,
+            "nodes_skipped": 0,
+            "edges_created": 0,
+        }
+    
+    # Stream the log, holding only the significant commits up to the max limit.
+    # The rest of the log is still read so total_commits matches a dry run.
+    limit = filter_config.max_commits or None
+    total_commits = 0
+    significant = []
+    for commit in iter_git_log(repo_path, filter_config):
+        total_commits += 1
+        if (limit is None or len(significant) < limit) and is_significant(commit, filter_config):
+            significant.append(commit)
     
     stats = {
-        "total_commits": len(all_commits),
+        "total_commits": total_commits,
         "significant_commits": len(significant),
         "nodes_created": 0,
         "nodes_skipped": 0,
         "edges_created": 0,
     }
     
-    if dry_run:
-        return stats
-    
     # Track created nodes and their files for linking
     nodes_by_hash: dict[str, UUID] = {}
     files_to_nodes: dict[str, list[UUID]] = {}
     
-    for commit in significant:
-        node = commit_to_node(commit, repo_name)
-        
-        # Generate content hash for dedup
-        hash_val = content_hash(node.what, str(node.when), node.source)
-        
+    nodes = [commit_to_node(commit, repo_name) for commit in significant]
+    
+    # Generate content hashes for dedup
+    hashes = [content_hash(n.what, str(n.when), n.source) for n in nodes]
+    
+    # The whole import is one transaction - a commit per node or edge would
+    # cost an fsync each
+    storage.begin_batch()
+    try:
         # Add with deduplication
-        node_id, was_new = add_node_with_dedup(storage, node, hash_val)
+        results = add_nodes_with_dedup(storage, nodes, hashes)
         
-        if was_new:
-            stats["nodes_created"] += 1
-            nodes_by_hash[commit.hash] = node_id
-            
-            # Track files for linking
-            for file in commit.files:
-                if file not in files_to_nodes:
-                    files_to_nodes[file] = []
-                files_to_nodes[file].append(node_id)
-        else:
-            stats["nodes_skipped"] += 1
-    
-    # Create edges between related commits (same files)
-    if link_related:
-        created_edges = set()
-        for file, node_ids in files_to_nodes.items():
-            # Link nodes that touched the same file
-            for i, source_id in enumerate(node_ids):
-                for target_id in node_ids[i+1:]:
-                    edge_key = (min(str(source_id), str(target_id)), 
-                               max(str(source_id), str(target_id)))
+        for commit, (node_id, was_new) in zip(significant, results):
+            if was_new:
+                stats["nodes_created"] += 1
+                nodes_by_hash[commit.hash] = node_id
+                
+                # Track files for linking
+                for file in commit.files:
+                    if file not in files_to_nodes:
+                        files_to_nodes[file] = []
+                    files_to_nodes[file].append(node_id)
+            else:
+                stats["nodes_skipped"] += 1
+        
+        # Chain the commits that touched each file, newest to oldest. Linking
+        # every pair would be quadratic in how often a file changes.
+        if link_related:
+            created_edges = set()
+            pending_edges = []
+            for file, node_ids in files_to_nodes.items():
+                # Log order is newest first, so each commit follows the next one
+                for source_id, target_id in zip(node_ids, node_ids[1:]):
+                    # Commits sharing several files are still linked once
+                    edge_key = (source_id, target_id)
                     if edge_key not in created_edges:
-                        edge = Edge(
+                        pending_edges.append(Edge(
                             source_id=source_id,
                             target_id=target_id,
-                            type=EdgeType.RELATES_TO,
+                            type=EdgeType.PRECEDED_BY,
                             metadata={"shared_file": file},
-                        )
-                        storage.add_edge(edge)
+                        ))
                         created_edges.add(edge_key)
-                        stats["edges_created"] += 1
+                        
+                        if len(pending_edges) >= IMPORT_BATCH_SIZE:
+                            storage.add_edges(pending_edges)
+                            pending_edges = []
+            
+            if pending_edges:
+                storage.add_edges(pending_edges)
+            stats["edges_created"] = len(created_edges)
+    except Exception:
+        storage.end_batch(rollback=True)
+        raise
+    storage.end_batch()
     
     return stats
@@ -4,8 +4,7 @@ Graph traversal for multi-hop memory queries.
 The "six degrees" part - finding related context through edges.
 """
 
-from collections import deque
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from uuid import UUID
 
 from ..core import StorageBackend, MemoryNode, Edge, EdgeType, QueryResult
@@ -42,61 +41,150 @@ class MemoryTraverser:
         Returns:
             List of QueryResults with nodes and traversal paths
         """
-        visited: set[UUID] = set()
-        results: list[QueryResult] = []
+        return self.traverse_bfs_multi(
+            [start_id],
+            max_hops=max_hops,
+            edge_types=edge_types,
+            direction=direction,
+            include_start=include_start,
+        )
+    
+    def traverse_bfs_multi(
+        self,
+        seeds: Iterable[UUID],
+        max_hops: int = 2,
+        edge_types: Optional[list[EdgeType]] = None,
+        direction: str = "both",
+        include_start: bool = True
+    ) -> list[QueryResult]:
+        """
+        Breadth-first traversal from several starting nodes at once.
         
-        # Queue: (node_id, hop_count, path)
-        queue: deque[tuple[UUID, int, list[UUID]]] = deque()
-        queue.append((start_id, 0, [start_id]))
+        All seeds share one visited set and one frontier, so overlapping
+        neighborhoods are only walked once. Each hop level costs a single
+        batched edge lookup and a single batched node fetch.
         
-        while queue:
-            current_id, hop_count, path = queue.popleft()
-            
-            if current_id in visited:
-                continue
-            visited.add(current_id)
-            
-            # Get the node
-            node = self.storage.get_node(current_id)
-            if not node:
-                continue
+        Args:
+            seeds: Nodes to start from (hop 0)
+            max_hops: Maximum edges to traverse (default 2)
+            edge_types: Filter to specific relationship types
+            direction: "outgoing", "incoming", or "both"
+            include_start: Whether to include the seed nodes in results
+        
+        Returns:
+            List of QueryResults in BFS order, each with the path from its nearest seed
+        """
+        # Flat arena of (node_id, parent_index, depth) entries. Each hop level
+        # occupies the contiguous window [depth_start, depth_end), and paths are
+        # rebuilt by walking parent indices instead of copying a list per node.
+        entries: list[tuple[UUID, int, int]] = []
+        
+        # Visited/lookup maps are keyed by the UUID's 128-bit int: hashing and
+        # comparing ints stays in C, while UUID keys call Python __hash__/__eq__
+        index_of: dict[int, int] = {}
+        
+        for seed_id in seeds:
+            if seed_id.int not in index_of:
+                index_of[seed_id.int] = len(entries)
+                entries.append((seed_id, -1, 0))
+        
+        seed_count = len(entries)
+        nodes = {
+            node_id.int: node
+            for node_id, node in self.storage.get_nodes(e[0] for e in entries).items()
+        }
+        depth_start, depth_end = 0, seed_count
+        depth = 0
+        
+        while depth < max_hops and depth_start < depth_end:
+            depth += 1
+            frontier = [
+                entries[i][0] for i in range(depth_start, depth_end)
+                if entries[i][0].int in nodes
+            ]
+            if not frontier:
+                break
             
-            # Add to results (skip start node if not wanted)
-            if include_start or current_id != start_id:
-                results.append(QueryResult(
-                    node=node,
-                    score=1.0 / (hop_count + 1),  # Closer = higher score
-                    path=path,
-                    hop_count=hop_count
-                ))
+            # Group neighbors by the frontier node they were reached from
+            adjacency: dict[int, list[UUID]] = {}
+            for from_id, next_id in self.storage.get_neighbors(
+                frontier, direction=direction, edge_types=edge_types
+            ):
+                adjacency.setdefault(from_id.int, []).append(next_id)
             
-            # Don't traverse beyond max_hops
-            if hop_count >= max_hops:
-                continue
+            # Claim unvisited neighbors in frontier order to keep BFS ordering stable
+            for from_id in frontier:
+                parent_idx = index_of[from_id.int]
+                for next_id in adjacency.get(from_id.int, ()):
+                    if next_id.int not in index_of:
+                        index_of[next_id.int] = len(entries)
+                        entries.append((next_id, parent_idx, depth))
             
-            # Get edges and continue traversal
-            for edge_type in (edge_types or list(EdgeType)):
-                edges = self.storage.get_edges(
-                    current_id,
-                    direction=direction,
-                    edge_type=edge_type
-                )
-                
-                for edge in edges:
-                    # Determine next node based on direction
-                    if edge.source_id == current_id:
-                        next_id = edge.target_id
-                    else:
-                        next_id = edge.source_id
-                    
-                    if next_id not in visited:
-                        queue.append((
-                            next_id,
-                            hop_count + 1,
-                            path + [next_id]
-                        ))
-        
-        return results
+            depth_start, depth_end = depth_end, len(entries)
+            nodes.update(
+                (node_id.int, node)
+                for node_id, node in self.storage.get_nodes(
+                    entries[i][0] for i in range(depth_start, depth_end)
+                ).items()
+            )
+        
+        # Only materialize results for nodes that exist and are being returned
+        first = 0 if include_start else seed_count
+        return [
+            QueryResult(
+                node=nodes[node_id.int],
+                score=1.0 / (hop_count + 1),  # Closer = higher score
+                path=self.reconstruct_path(entries, i),
+                hop_count=hop_count
+            )
+            for i, (node_id, _, hop_count) in enumerate(entries[first:], start=first)
+            if node_id.int in nodes
+        ]
+    
+    def traverse_bfs_ids(
+        self,
+        seeds: Iterable[UUID],
+        max_hops: int = 2,
+        edge_types: Optional[list[EdgeType]] = None,
+        direction: str = "both",
+        include_start: bool = False
+    ) -> Iterator[UUID]:
+        """
+        Breadth-first traversal that yields node IDs only.
+        
+        Like traverse_bfs_multi, but never fetches node rows or builds
+        QueryResults - use it when the caller batch-fetches nodes itself.
+        IDs are yielded level by level and may include nodes that no longer
+        exist, so fetch-and-filter at the end.
+        """
+        frontier = list(dict.fromkeys(seeds))
+        visited = {node_id.int for node_id in frontier}
+        
+        if include_start:
+            yield from frontier
+        
+        for _ in range(max_hops):
+            if not frontier:
+                break
+            next_frontier = []
+            for _, next_id in self.storage.get_neighbors(
+                frontier, direction=direction, edge_types=edge_types
+            ):
+                if next_id.int not in visited:
+                    visited.add(next_id.int)
+                    next_frontier.append(next_id)
+            yield from next_frontier
+            frontier = next_frontier
+    
+    @staticmethod
+    def reconstruct_path(entries: list[tuple[UUID, int, int]], index: int) -> list[UUID]:
+        """Walk parent indices back from an arena entry to its seed."""
+        path = []
+        while index >= 0:
+            node_id, index, _ = entries[index]
+            path.append(node_id)
+        path.reverse()
+        return path
     
     def find_path(
         self,
@@ -108,6 +196,30 @@ class MemoryTraverser:
         Find the shortest path between two nodes.
         
         The "six degrees" query - how are these two memories connected?
+        Searches from both ends at once; see find_path_bidir.
+        
+        Args:
+            from_id: Starting node
+            to_id: Target node
+            max_hops: Maximum path length
+        
+        Returns:
+            List of nodes forming the path, or None if no path exists
+        """
+        return self.find_path_bidir(from_id, to_id, max_hops=max_hops)
+    
+    def find_path_bidir(
+        self,
+        from_id: UUID,
+        to_id: UUID,
+        max_hops: int = 6
+    ) -> Optional[list[MemoryNode]]:
+        """
+        Find the shortest path between two nodes, searching from both ends.
+        
+        Each step expands whichever frontier is smaller by one full hop level
+        (one batched neighbor query), stopping as soon as the two searches
+        meet. This visits roughly O(b^(d/2)) nodes instead of O(b^d).
         
         Args:
             from_id: Starting node
@@ -121,36 +233,63 @@ class MemoryTraverser:
             node = self.storage.get_node(from_id)
             return [node] if node else None
         
-        visited: set[UUID] = set()
-        queue: deque[tuple[UUID, list[UUID]]] = deque()
-        queue.append((from_id, [from_id]))
+        # Per side: node int -> (parent UUID or None, depth), keyed like traverse_bfs_multi
+        forward: dict[int, tuple[Optional[UUID], int]] = {from_id.int: (None, 0)}
+        backward: dict[int, tuple[Optional[UUID], int]] = {to_id.int: (None, 0)}
+        forward_frontier = [from_id]
+        backward_frontier = [to_id]
+        forward_depth = backward_depth = 0
         
-        while queue:
-            current_id, path = queue.popleft()
-            
-            if len(path) > max_hops + 1:
-                continue
+        while forward_frontier and backward_frontier and forward_depth + backward_depth < max_hops:
+            expand_forward = len(forward_frontier) <= len(backward_frontier)
+            if expand_forward:
+                frontier, seen, other = forward_frontier, forward, backward
+                forward_depth += 1
+                depth = forward_depth
+            else:
+                frontier, seen, other = backward_frontier, backward, forward
+                backward_depth += 1
+                depth = backward_depth
             
-            if current_id in visited:
-                continue
-            visited.add(current_id)
+            # Finish the whole level so we can pick the shortest meeting point
+            next_frontier: list[UUID] = []
+            meeting: Optional[UUID] = None
+            for current_id, next_id in self.storage.get_neighbors(frontier):
+                if next_id.int in seen:
+                    continue
+                seen[next_id.int] = (current_id, depth)
+                next_frontier.append(next_id)
+                if next_id.int in other:
+                    if meeting is None or other[next_id.int][1] < other[meeting.int][1]:
+                        meeting = next_id
             
-            # Get all connected nodes
-            edges = self.storage.get_edges(current_id)
+            if meeting is not None:
+                path_ids = self._walk_parents(forward, meeting)
+                path_ids.reverse()
+                path_ids.extend(self._walk_parents(backward, meeting)[1:])
+                nodes = self.storage.get_nodes(path_ids)
+                return [nodes.get(nid) for nid in path_ids]
             
-            for edge in edges:
-                next_id = edge.target_id if edge.source_id == current_id else edge.source_id
-                
-                if next_id == to_id:
-                    # Found the path!
-                    full_path = path + [next_id]
-                    return [self.storage.get_node(nid) for nid in full_path]
-                
-                if next_id not in visited:
-                    queue.append((next_id, path + [next_id]))
+            if expand_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
         
         return None  # No path found
     
+    @staticmethod
+    def _walk_parents(
+        parents: dict[int, tuple[Optional[UUID], int]],
+        node_id: UUID
+    ) -> list[UUID]:
+        """Follow parent links from node_id back to its search root."""
+        path = [node_id]
+        parent = parents[node_id.int][0]
+        while parent is not None:
+            path.append(parent)
+            parent = parents[parent.int][0]
+        return path
+    
     def find_related(
         self,
         node_id: UUID,
@@ -164,16 +303,14 @@ class MemoryTraverser:
             - find_related(decision_id, CAUSED_BY) -> what caused this decision?
             - find_related(project_id, PART_OF, "incoming") -> what's part of this project?
         """
-        edges = self.storage.get_edges(node_id, direction=direction, edge_type=relationship)
-        
-        result_ids = set()
-        for edge in edges:
-            if edge.source_id == node_id:
-                result_ids.add(edge.target_id)
-            else:
-                result_ids.add(edge.source_id)
+        # One neighbor query and one batched node fetch, not two lookups per edge
+        result_ids = dict.fromkeys(
+            next_id for _, next_id in self.storage.get_neighbors(
+                [node_id], direction=direction, edge_types=[relationship]
+            )
+        )
         
-        return [self.storage.get_node(nid) for nid in result_ids if self.storage.get_node(nid)]
+        return list(self.storage.get_nodes(result_ids).values())
     
     def get_context_window(
         self,
@@ -30,6 +30,17 @@ class TestAgentMemoryBasics:
                 node_id = memory.log_event("Test event")
                 assert node_id is not None
     
+    def test_storage_opened_lazily(self):
+        """Test that the database isn't touched until first use."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "nested" / "test.db"
+            memory = AgentMemory(str(db_path))
+            assert not db_path.exists()
+            
+            memory.log_event("First write")
+            assert db_path.exists()
+            memory.close()
+    
     def test_log_task(self, agent_memory):
         """Test logging a task."""
         node_id = agent_memory.log_task(
@@ -87,6 +98,43 @@ class TestAgentMemoryBasics:
         assert node.type == NodeType.EVENT
 
 
+class TestBatching:
+    """Test batched memory logging."""
+    
+    def test_batch_defers_writes_until_exit(self, agent_memory):
+        """Test that batched logs are written together on exit."""
+        with agent_memory.batch():
+            task_id = agent_memory.log_task("Batched task")
+            insight_id = agent_memory.log_insight("Batched insight")
+            assert agent_memory.storage.get_node(task_id) is None
+        
+        assert agent_memory.storage.get_node(task_id) is not None
+        assert agent_memory.storage.get_node(insight_id) is not None
+        
+        # Logs in one batch share a timestamp
+        task = agent_memory.storage.get_node(task_id)
+        insight = agent_memory.storage.get_node(insight_id)
+        assert task.when == insight.when
+        
+        # Auto-link to the last task still happens inside a batch
+        edges = agent_memory.storage.get_edges(task_id)
+        assert len(edges) == 1
+        assert edges[0].target_id == insight_id
+    
+    def test_batch_discards_on_error(self, agent_memory):
+        """Test that a failing batch writes nothing."""
+        with pytest.raises(RuntimeError):
+            with agent_memory.batch():
+                task_id = agent_memory.log_task("Never saved")
+                raise RuntimeError("boom")
+        
+        assert agent_memory.storage.get_node(task_id) is None
+        
+        # Memory is usable again afterwards
+        node_id = agent_memory.log_event("After failure")
+        assert agent_memory.storage.get_node(node_id) is not None
+
+
 class TestContextLoading:
     """Test context loading functionality."""
     
@@ -104,6 +152,27 @@ class TestContextLoading:
         context = agent_memory.load_context(tags=["project"])
         assert len(context) >= 3
     
+    def test_load_context_without_hops(self, agent_memory):
+        """Test that max_hops=0 returns only the recent nodes, newest first."""
+        first = agent_memory.log_task("First")
+        agent_memory.log_task("Linked", link_to=first)
+        
+        context = agent_memory.load_context(max_hops=0, limit=1)
+        assert [n.what for n in context] == ["Linked"]
+    
+    def test_load_context_expands_tagged_nodes(self, agent_memory):
+        """Test that hops pull in related nodes outside the tag filter."""
+        untagged = agent_memory.log_event("Untagged follow-up")
+        agent_memory.log_task("Tagged task", tags=["api"])
+        tagged = agent_memory.log_task("Tagged task 2", tags=["api"], link_to=untagged)
+        
+        context = agent_memory.load_context(tags=["api"], max_hops=1, limit=2)
+        assert tagged in {n.id for n in context}
+        assert len(context) == 2
+        
+        context = agent_memory.load_context(tags=["api"], max_hops=1)
+        assert untagged in {n.id for n in context}
+    
     def test_get_recent_tasks(self, agent_memory):
         """Test retrieving recent tasks."""
         agent_memory.log_task("Task A")
@@ -114,6 +183,16 @@ class TestContextLoading:
         assert len(tasks) == 2
         assert all(t.type == NodeType.TASK for t in tasks)
     
+    def test_get_recent_tasks_beyond_recent_window(self, agent_memory):
+        """Test that rare tasks are found even behind many newer events."""
+        agent_memory.log_task("Old task")
+        with agent_memory.batch():
+            for i in range(150):
+                agent_memory.log_event(f"Event {i}")
+        
+        tasks = agent_memory.get_recent_tasks(limit=5)
+        assert [t.what for t in tasks] == ["Old task"]
+    
     def test_get_insights(self, agent_memory):
         """Test retrieving insights."""
         agent_memory.log_insight("Insight 1", tags=["python"])
@@ -6,7 +6,7 @@ from click.testing import CliRunner
 from datetime import datetime, timedelta
 from uuid import UUID
 
-from engram.cli import cli, get_storage, parse_datetime
+from engram.cli import _parse_time_string, cli, get_storage, parse_datetime
 from engram.core import MemoryNode, Edge, EdgeType, NodeType, SQLiteBackend
 
 
@@ -156,6 +156,19 @@ class TestParseDatetime:
         assert result.hour == 15
         assert result.minute == 0
     
+    def test_parse_today_with_24h_time(self):
+        """Parse 'today 14:30' format."""
+        result = parse_datetime("today 14:30")
+        assert result.date() == datetime.now().date()
+        assert result.hour == 14
+        assert result.minute == 30
+    
+    def test_parse_time_string_rejects_malformed(self):
+        """Malformed clock times raise ValueError."""
+        for value in ("123am", "am", "6:0", "6:000", ":30", "6"):
+            with pytest.raises(ValueError):
+                _parse_time_string(value)
+    
     def test_parse_natural_language(self):
         """Parse various natural language formats."""
         # These should not raise ValueError
@@ -163,6 +176,11 @@ class TestParseDatetime:
         assert result.year == 2026
         assert result.month == 2
         assert result.day == 10
+    
+    def test_parse_us_date(self):
+        """MM/DD/YYYY is read month-first, matching dateutil."""
+        assert parse_datetime("02/10/2026") == datetime(2026, 2, 10)
+        assert parse_datetime("13/02/2026") == datetime(2026, 2, 13)
 
 
 class TestAddCommand:
@@ -264,6 +282,18 @@ class TestQueryCommand:
         assert result.exit_code == 0
         # Should expand to include connected nodes
     
+    def test_query_with_hops_expands_and_dedupes(self, runner, storage_with_data):
+        db_path, nodes = storage_with_data
+        
+        # Only nodes[1] has the "design" tag; nodes[2] is one hop away
+        result = runner.invoke(cli, ["--db", db_path, "query", "--tags", "design", "--hops", "1", "--json"])
+        assert [item["id"] for item in json.loads(result.output)] == [str(nodes[1].id), str(nodes[2].id)]
+        
+        # Both "logo" nodes match and neighbour each other - each is listed once
+        result = runner.invoke(cli, ["--db", db_path, "query", "--tags", "logo", "--hops", "2", "--json"])
+        ids = [item["id"] for item in json.loads(result.output)]
+        assert sorted(ids) == sorted([str(nodes[1].id), str(nodes[2].id)])
+    
     def test_query_json_output(self, runner, storage_with_data):
         db_path, nodes = storage_with_data
         
@@ -276,6 +306,37 @@ class TestQueryCommand:
         assert all("id" in item for item in data)
         assert all("what" in item for item in data)
     
+    def test_query_text_json_matches_node_json(self, runner, storage_with_data):
+        """The SQL-built JSON for text search matches the per-node serialization."""
+        db_path, nodes = storage_with_data
+        
+        text_result = runner.invoke(cli, ["--db", db_path, "query", "logo", "--json"])
+        tag_result = runner.invoke(cli, ["--db", db_path, "query", "--tags", "logo", "--json"])
+        
+        assert text_result.exit_code == 0
+        text_lines = text_result.output.strip().split("\n")
+        assert len(text_lines) == 4  # [, two nodes, ]
+        assert sorted(line.rstrip(",") for line in text_lines) == \
+            sorted(line.rstrip(",") for line in tag_result.output.strip().split("\n"))
+    
+    def test_query_json_without_orjson(self, runner, storage_with_data, monkeypatch):
+        """The stdlib fallback produces the same document as orjson."""
+        import engram.cli
+        db_path, nodes = storage_with_data
+        
+        first = runner.invoke(cli, ["--db", db_path, "query", "--tags", "logo", "--json"])
+        monkeypatch.setattr(engram.cli, "_load_orjson", lambda: None)
+        fallback = runner.invoke(cli, ["--db", db_path, "query", "--tags", "logo", "--json"])
+        
+        assert fallback.exit_code == 0
+        assert fallback.output == first.output
+    
+    def test_query_json_output_empty(self, runner, temp_db):
+        result = runner.invoke(cli, ["--db", temp_db, "query", "--json"])
+        
+        assert result.exit_code == 0
+        assert json.loads(result.output) == []
+    
     def test_query_empty_results(self, runner, temp_db):
         result = runner.invoke(cli, ["--db", temp_db, "query", "nonexistent"])
         
@@ -339,6 +400,7 @@ class TestRelateCommand:
         
         assert result.exit_code == 0
         assert "Related:" in result.output
+        assert "--[led_to]-->" in result.output
         # Verify the edge was actually created by checking show command
         show_result = runner.invoke(cli, ["--db", db_path, "show", str(nodes[0].id)])
         assert "Connections:" in show_result.output
@@ -359,6 +421,27 @@ class TestRelateCommand:
         show_result = runner.invoke(cli, ["--db", db_path, "show", str(nodes[0].id)])
         assert "Connections:" in show_result.output
     
+    def test_relate_by_partial_ids(self, runner, storage_with_data):
+        db_path, nodes = storage_with_data
+        
+        result = runner.invoke(cli, [
+            "--db", db_path,
+            "relate",
+            str(nodes[0].id)[:8],
+            str(nodes[2].id)[:8],
+        ])
+        
+        assert result.exit_code == 0
+        assert f"Related: {str(nodes[0].id)[:8]}" in result.output
+    
+    def test_relate_unknown_partial_id(self, runner, storage_with_data):
+        db_path, nodes = storage_with_data
+        
+        result = runner.invoke(cli, ["--db", db_path, "relate", "zzzz", str(nodes[0].id)[:8]])
+        
+        assert result.exit_code == 0
+        assert "No memory found matching: zzzz" in result.output
+    
     def test_relate_with_partial_ids(self, runner, storage_with_data):
         db_path, nodes = storage_with_data
         
@@ -391,6 +474,19 @@ class TestPathCommand:
         assert result.exit_code == 0
         assert "Path" in result.output or "steps" in result.output
     
+    def test_path_by_partial_ids(self, runner, storage_with_data):
+        db_path, nodes = storage_with_data
+        
+        result = runner.invoke(cli, [
+            "--db", db_path,
+            "path",
+            str(nodes[1].id)[:8],
+            str(nodes[2].id)[:8],
+        ])
+        
+        assert result.exit_code == 0
+        assert "Path (2 steps)" in result.output
+    
     def test_no_path_found(self, runner, storage_with_data):
         db_path, nodes = storage_with_data
         
@@ -571,6 +667,40 @@ Content here.
             import os
             os.unlink(md_path)
     
+    def test_import_md_infers_type_from_header(self, runner, temp_db):
+        """Earlier keyword groups win regardless of position in the header."""
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+            f.write("""## Project decision
+
+Went with SQLite.
+
+## Tasks for the week
+
+Ship it.
+
+## Weekly notes
+
+Nothing special.
+""")
+            md_path = f.name
+        
+        try:
+            result = runner.invoke(cli, ["--db", temp_db, "import-md", md_path])
+            assert result.exit_code == 0
+            
+            storage = get_storage(temp_db)
+            types = {n.what.split("\n")[0]: n.type for n in storage.query_by_time()}
+            storage.close()
+            assert types == {
+                "Project decision": NodeType.DECISION,
+                "Tasks for the week": NodeType.TASK,
+                "Weekly notes": NodeType.EVENT,
+            }
+        finally:
+            import os
+            os.unlink(md_path)
+    
     def test_import_md_with_tags(self, runner, temp_db):
         """Test adding tags to imported nodes."""
         import tempfile
@@ -582,14 +712,70 @@ Just a note.
             md_path = f.name
         
         try:
-            result = runner.invoke(cli, ["--db", temp_db, "import-md", md_path, "--tag", "imported", "--tag", "test"])
+            result = runner.invoke(cli, ["--db", temp_db, "import-md", md_path, "--tag", "note", "--tag", "test"])
             assert result.exit_code == 0
             assert "Imported:" in result.output
+            
+            # Header words come first, then --tag values, without duplicates
+            storage = get_storage(temp_db)
+            node = storage.query_by_time(limit=1)[0]
+            storage.close()
+            assert node.tags == ["quick", "note", "test"]
         finally:
             import os
             os.unlink(md_path)
 
 
+class TestImportMdStorage:
+    """Tests for how import-md touches the database."""
+    
+    def test_dry_run_does_not_open_database(self, runner, tmp_path):
+        md_path = tmp_path / "notes.md"
+        md_path.write_text("## Section\n\nBody text.\n")
+        db_path = tmp_path / "never.db"
+        
+        result = runner.invoke(cli, ["--db", str(db_path), "import-md", str(md_path), "--dry-run"])
+        
+        assert result.exit_code == 0
+        assert not db_path.exists()
+    
+    def test_import_commits_once(self, runner, temp_db, tmp_path, monkeypatch):
+        md_path = tmp_path / "notes.md"
+        md_path.write_text("".join(f"## Section {i}\n\nBody {i}.\n\n" for i in range(20)))
+        commits = []
+        real_add_nodes = SQLiteBackend.add_nodes
+        
+        def tracking_add_nodes(self, nodes):
+            self.conn.set_trace_callback(
+                lambda sql: commits.append(sql) if sql.upper().startswith("COMMIT") else None
+            )
+            try:
+                return real_add_nodes(self, nodes)
+            finally:
+                self.conn.set_trace_callback(None)
+        
+        monkeypatch.setattr(SQLiteBackend, "add_nodes", tracking_add_nodes)
+        
+        result = runner.invoke(cli, ["--db", temp_db, "import-md", str(md_path)])
+        
+        assert result.exit_code == 0
+        assert "20 nodes" in result.output
+        assert len(commits) == 1
+    
+    def test_section_header_and_body_are_trimmed(self, runner, temp_db, tmp_path):
+        md_path = tmp_path / "notes.md"
+        md_path.write_text("## Header only\n\n## Spaced Header  \n\n\n  Line one\n\nLine two  \n\n")
+        
+        result = runner.invoke(cli, ["--db", temp_db, "import-md", str(md_path)])
+        
+        assert result.exit_code == 0
+        assert "1 nodes" in result.output
+        with get_storage(temp_db) as storage:
+            (node,) = storage.query_nodes()
+        assert node.what == "Spaced Header\n\nLine one\n\nLine two"
+        assert node.tags == ["spaced", "header"]
+
+
 class TestStats:
     """Tests for the stats command."""
     
@@ -630,15 +816,100 @@ class TestExport:
         assert "Test memory" in result.output
         assert "test" in result.output
     
+    def test_export_md_in_blocks(self, runner, storage_with_data, monkeypatch):
+        """Blocks smaller than the export still cover every node once."""
+        import engram.cli
+        db_path, nodes = storage_with_data
+        monkeypatch.setattr(engram.cli, "_EXPORT_WRITE_BATCH", 2)
+        
+        result = runner.invoke(cli, ["--db", db_path, "export", "--format", "md"])
+        
+        assert result.exit_code == 0
+        assert "Total: 3 memories" in result.output
+        assert result.output.count("## ") == 3
+        assert result.output.count("- **Edges:**") == 2
+    
+    def test_export_md_when_lines(self, runner, temp_db):
+        """Shared and distinct timestamps each get their own When line."""
+        storage = SQLiteBackend(temp_db)
+        storage.initialize()
+        shared = datetime(2026, 2, 10, 9, 30, 15)
+        storage.add_nodes([
+            MemoryNode(what="First section", when=shared),
+            MemoryNode(what="Second section", when=shared),
+            MemoryNode(what="Next day", when=datetime(2026, 2, 11, 8, 5)),
+        ])
+        storage.close()
+        
+        result = runner.invoke(cli, ["--db", temp_db, "export", "--format", "md"])
+        
+        assert result.exit_code == 0
+        assert result.output.count("- **When:** 2026-02-10 09:30\n") == 2
+        assert result.output.count("- **When:** 2026-02-11 08:05\n") == 1
+    
     def test_export_json(self, runner, temp_db):
         """Test JSON export."""
         runner.invoke(cli, ["--db", temp_db, "add", "JSON test", "--type", "artifact"])
         
         result = runner.invoke(cli, ["--db", temp_db, "export", "--format", "json"])
         assert result.exit_code == 0
-        assert '"type": "artifact"' in result.output
-        assert '"what": "JSON test"' in result.output
-
+        assert '"type":"artifact"' in result.output
+        assert '"what":"JSON test"' in result.output
+    
+    def test_export_json_streams_records(self, runner, storage_with_data, monkeypatch):
+        """Each record reaches stdout before the next one is read."""
+        import sys
+        db_path, nodes = storage_with_data
+        real_export = SQLiteBackend.export_nodes_json
+        written_before = []
+        
+        def watching_export(self, *args, **kwargs):
+            for record in real_export(self, *args, **kwargs):
+                written_before.append(sys.stdout.buffer.getvalue().count(b'"id":'))
+                yield record
+        
+        monkeypatch.setattr(SQLiteBackend, "export_nodes_json", watching_export)
+        
+        result = runner.invoke(cli, ["--db", db_path, "export", "--format", "json"])
+        
+        assert result.exit_code == 0
+        assert written_before == [0, 1, 2]
+        assert len(json.loads(result.output)) == 3
+    
+    def test_export_json_records(self, runner, storage_with_data):
+        """Each record carries the node fields plus edges touching it."""
+        db_path, nodes = storage_with_data
+        
+        result = runner.invoke(cli, ["--db", db_path, "export", "--format", "json"])
+        
+        assert result.exit_code == 0
+        by_id = {item["id"]: item for item in json.loads(result.output)}
+        assert list(by_id) == [str(n.id) for n in reversed(nodes)]  # newest first
+        assert by_id[str(nodes[1].id)] == {
+            "id": str(nodes[1].id),
+            "type": "event",
+            "what": "Created the logo design",
+            "when": "2026-02-10T10:00:00",
+            "where": "Studio",
+            "who": ["River"],
+            "why": "Client requested branding",
+            "how": "Generated AI variations",
+            "tags": ["logo", "design"],
+            "artifacts": [],
+            "edges": [{"target": str(nodes[2].id), "type": "led_to"}],
+        }
+        # The edge is listed under both of its nodes; unconnected nodes have no key
+        assert by_id[str(nodes[2].id)]["edges"] == [{"target": str(nodes[2].id), "type": "led_to"}]
+        assert "edges" not in by_id[str(nodes[0].id)]
+    
+    def test_export_json_since(self, runner, storage_with_data):
+        db_path, nodes = storage_with_data
+        
+        result = runner.invoke(cli, [
+            "--db", db_path, "export", "--format", "json", "--since", "2026-02-10 10:00",
+        ])
+        
+        assert [item["id"] for item in json.loads(result.output)] == [str(nodes[2].id), str(nodes[1].id)]
 
 class TestTreesAndRoots:
     """Tests for tree/root model CLI functionality."""
@@ -767,3 +1038,101 @@ class TestTreesAndRoots:
         result = runner.invoke(cli, ["--db", temp_db, "stats"])
         assert result.exit_code == 0
         assert "Nodes by Type" in result.output
+
+
+class TestStorageLifetime:
+    """Commands release the database even when they fail."""
+    
+    def test_failed_command_closes_storage(self, runner, temp_db):
+        from engram.core.storage import _thread_connections
+        
+        result = runner.invoke(cli, ["--db", temp_db, "query", "--since", "not a date"])
+        
+        assert isinstance(result.exception, ValueError)
+        assert _thread_connections() == {}
+    
+    @pytest.mark.parametrize("args", [
+        ["show", "ffffffff"],
+        ["path", "ffffffff", "eeeeeeee"],
+        ["relate", "ffffffff", "eeeeeeee"],
+        ["context", "ffffffff"],
+    ])
+    def test_early_exits_close_storage(self, runner, storage_with_data, args):
+        from engram.core.storage import _thread_connections
+        db_path, _ = storage_with_data
+        
+        runner.invoke(cli, ["--db", db_path, *args])
+        
+        assert _thread_connections() == {}
+
+
+class TestShell:
+    """Tests for the shell command."""
+    
+    def test_shell_runs_each_line(self, runner, temp_db):
+        script = "\n".join([
+            "# comment lines are skipped",
+            'add "Shipped the release" --tags release',
+            "",
+            "query release --json",
+        ]) + "\n"
+        
+        result = runner.invoke(cli, ["--db", temp_db, "shell"], input=script)
+        
+        assert result.exit_code == 0
+        assert "Shipped the release" in result.output
+    
+    def test_shell_reuses_one_connection(self, runner, temp_db, monkeypatch):
+        import sqlite3
+        connects = []
+        real_connect = sqlite3.connect
+        
+        def counting_connect(*args, **kwargs):
+            connects.append(args)
+            return real_connect(*args, **kwargs)
+        
+        monkeypatch.setattr(sqlite3, "connect", counting_connect)
+        script = 'add "One"\nadd "Two"\nquery --since yesterday\nstats\n'
+        
+        result = runner.invoke(cli, ["--db", temp_db, "shell"], input=script)
+        
+        assert result.exit_code == 0
+        assert len(connects) == 1
+    
+    def test_shell_continues_after_errors(self, runner, temp_db):
+        script = 'no-such-command\nadd "unclosed\nadd "After errors"\nquery After\nexit\nadd "Never"\n'
+        
+        result = runner.invoke(cli, ["--db", temp_db, "shell"], input=script)
+        
+        assert result.exit_code == 0
+        assert "No such command" in result.output
+        assert "After errors" in result.output
+        
+        storage = get_storage(temp_db)
+        assert storage.count_nodes() == 1
+        storage.close()
+
+
+class TestStartupImports:
+    """Heavy optional modules stay out of commands that don't need them."""
+    
+    def _loaded_after(self, args):
+        import subprocess
+        import sys
+        code = (
+            "import sys\n"
+            "from engram.cli import cli\n"
+            f"cli.main(args={args!r}, standalone_mode=False)\n"
+            "print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] in ('rich', 'dateutil'))))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        return result.stdout.splitlines()[-1].split()
+    
+    def test_version_skips_rich_and_dateutil(self):
+        assert self._loaded_after(["--version"]) == []
+    
+    def test_iso_add_skips_dateutil(self, temp_db):
+        loaded = self._loaded_after(["--db", temp_db, "add", "Hi", "--when", "2026-02-10 14:30"])
+        assert not any(m.startswith("dateutil") for m in loaded)
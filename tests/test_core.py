@@ -11,6 +11,7 @@ from engram.core import (
     NodeType,
     SQLiteBackend,
 )
+from engram.core.storage import SCHEMA_VERSION
 
 
 @pytest.fixture
@@ -56,6 +57,52 @@ class TestMemoryNode:
 class TestSQLiteBackend:
     """Tests for SQLite storage backend."""
     
+    def test_connection_pragmas(self, storage):
+        assert storage.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert storage.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert storage.conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        assert storage.conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert storage.conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert storage.conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+    
+    def test_reopen_skips_schema_setup(self, tmp_path):
+        db_path = str(tmp_path / "reopen.db")
+        first = SQLiteBackend(db_path)
+        first.initialize()
+        node_id = first.add_node(MemoryNode(what="Persisted"))
+        first.close()
+        
+        second = SQLiteBackend(db_path)
+        second.initialize()
+        assert second.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert second.get_node(node_id).what == "Persisted"
+        second.close()
+    
+    def test_backends_share_thread_connection(self, tmp_path):
+        db_path = str(tmp_path / "shared.db")
+        first = SQLiteBackend(db_path)
+        second = SQLiteBackend(db_path)
+        first.initialize()
+        second.initialize()
+        assert first.conn is second.conn
+        
+        # Closing one backend leaves the connection open for the other
+        first.close()
+        node_id = second.add_node(MemoryNode(what="Still open"))
+        assert second.get_node(node_id) is not None
+        second.close()
+    
+    def test_context_manager_closes_on_error(self, tmp_path):
+        backend = SQLiteBackend(str(tmp_path / "ctx.db"))
+        backend.initialize()
+        
+        with pytest.raises(RuntimeError):
+            with backend as opened:
+                assert opened is backend
+                raise RuntimeError("boom")
+        
+        assert backend.conn is None
+    
     def test_add_and_get_node(self, storage):
         node = MemoryNode(
             what="Test memory",
@@ -69,6 +116,58 @@ class TestSQLiteBackend:
         assert retrieved.what == "Test memory"
         assert "test" in retrieved.tags
     
+    def test_get_nodes(self, storage):
+        id1 = storage.add_node(MemoryNode(what="First"))
+        id2 = storage.add_node(MemoryNode(what="Second"))
+        missing = uuid4()
+        
+        nodes = storage.get_nodes([id1, id2, missing, id1])
+        
+        assert set(nodes) == {id1, id2}
+        assert nodes[id1].what == "First"
+        assert nodes[id2].what == "Second"
+    
+    def test_resolve_id_prefix(self, storage):
+        node_id = storage.add_node(MemoryNode(what="First"))
+        storage.add_node(MemoryNode(what="Second"))
+        
+        assert storage.resolve_id_prefix(str(node_id)[:8]) == [node_id]
+        assert storage.resolve_id_prefix(str(node_id)[:8].upper()) == [node_id]
+        assert storage.resolve_id_prefix("", limit=5) == []
+        assert storage.resolve_id_prefix("not-hex*") == []
+        
+        # Prefixes ending at a hex/hyphen boundary still match exactly
+        full = str(node_id)
+        assert storage.resolve_id_prefix(full[:9]) == [node_id]  # Ends with "-"
+        assert storage.resolve_id_prefix(full) == [node_id]
+    
+    def test_resolve_id_prefix_uses_primary_key_range(self, storage):
+        plan = storage.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM nodes WHERE id >= ? AND id < ? LIMIT ?",
+            ("ab", "ac", 2)
+        ).fetchall()
+        assert "SEARCH" in plan[0][3]
+        assert "id>? AND id<?" in plan[0][3]
+    
+    def test_resolve_id_prefix_finds_old_nodes(self, storage):
+        now = datetime.now()
+        old = MemoryNode(what="Oldest", when=now - timedelta(days=3650))
+        storage.add_nodes([old] + [MemoryNode(what=f"Recent {i}", when=now) for i in range(1100)])
+        
+        # Not limited to a window of recent nodes
+        assert storage.resolve_id_prefix(str(old.id)[:13]) == [old.id]
+    
+    def test_get_nodes_limit_orders_by_recency(self, storage):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        ids = [
+            storage.add_node(MemoryNode(what=f"Node {i}", when=now - timedelta(hours=i)))
+            for i in range(5)
+        ]
+        
+        nodes = storage.get_nodes(reversed(ids), limit=3)
+        
+        assert [n.what for n in nodes.values()] == ["Node 0", "Node 1", "Node 2"]
+    
     def test_update_node(self, storage):
         node = MemoryNode(what="Original")
         node_id = storage.add_node(node)
@@ -89,6 +188,15 @@ class TestSQLiteBackend:
         assert success
         assert storage.get_node(node_id) is None
     
+    def test_delete_node_removes_edges(self, storage):
+        keep_id = storage.add_node(MemoryNode(what="Keep"))
+        gone_id = storage.add_node(MemoryNode(what="Gone"))
+        storage.add_edge(Edge(source_id=keep_id, target_id=gone_id))
+        
+        storage.delete_node(gone_id)
+        
+        assert storage.get_edges(keep_id) == []
+    
     def test_add_and_get_edge(self, storage):
         node1 = MemoryNode(what="Cause")
         node2 = MemoryNode(what="Effect")
@@ -109,6 +217,70 @@ class TestSQLiteBackend:
         assert edges[0].target_id == id2
         assert edges[0].type == EdgeType.LED_TO
     
+    def test_add_node_with_edges(self, storage):
+        parent_id = storage.add_node(MemoryNode(what="Parent"))
+        child = MemoryNode(what="Child")
+        
+        storage.add_node_with_edges(child, [
+            Edge(source_id=parent_id, target_id=child.id, type=EdgeType.LED_TO),
+        ])
+        
+        assert storage.get_node(child.id).what == "Child"
+        edges = storage.get_edges(child.id, direction="incoming")
+        assert [e.source_id for e in edges] == [parent_id]
+        assert not storage.conn.in_transaction
+    
+    def test_get_edges_both_directions_by_type(self, storage):
+        id1 = storage.add_node(MemoryNode(what="Hub"))
+        id2 = storage.add_node(MemoryNode(what="Out"))
+        id3 = storage.add_node(MemoryNode(what="In"))
+        
+        storage.add_edge(Edge(source_id=id1, target_id=id2, type=EdgeType.SUPPORTS))
+        storage.add_edge(Edge(source_id=id3, target_id=id1, type=EdgeType.LED_TO))
+        
+        # The type filter applies to both directions
+        edges = storage.get_edges(id1, edge_type=EdgeType.LED_TO)
+        assert len(edges) == 1
+        assert edges[0].source_id == id3
+    
+    def test_get_edges_bulk_matches_get_edges(self, storage):
+        id1 = storage.add_node(MemoryNode(what="Hub"))
+        id2 = storage.add_node(MemoryNode(what="Out"))
+        id3 = storage.add_node(MemoryNode(what="In"))
+        lonely = storage.add_node(MemoryNode(what="No edges"))
+        
+        storage.add_edge(Edge(source_id=id1, target_id=id2, type=EdgeType.SUPPORTS))
+        storage.add_edge(Edge(source_id=id3, target_id=id1, type=EdgeType.LED_TO))
+        storage.add_edge(Edge(source_id=id1, target_id=id1, type=EdgeType.RELATES_TO))
+        
+        for direction in ("outgoing", "incoming", "both"):
+            bulk = storage.get_edges_bulk([id1, id2, id3, lonely], direction=direction)
+            
+            assert lonely not in bulk
+            for node_id in (id1, id2, id3):
+                expected = storage.get_edges(node_id, direction=direction)
+                assert sorted(e.id for e in bulk.get(node_id, [])) == sorted(e.id for e in expected)
+    
+    def test_get_edges_with_endpoints(self, storage):
+        hub = storage.add_node(MemoryNode(what="Hub"))
+        out = storage.add_node(MemoryNode(what="Out", tags=["far"]))
+        into = storage.add_node(MemoryNode(what="In"))
+        storage.add_edge(Edge(source_id=hub, target_id=out, type=EdgeType.SUPPORTS, metadata={"k": 1}))
+        storage.add_edge(Edge(source_id=into, target_id=hub, type=EdgeType.LED_TO))
+        storage.add_edge(Edge(source_id=hub, target_id=hub, type=EdgeType.RELATES_TO))
+        
+        pairs = storage.get_edges_with_endpoints(hub)
+        
+        assert sorted(e.id for e, _ in pairs) == sorted(e.id for e in storage.get_edges(hub))
+        others = {e.type: other for e, other in pairs}
+        assert others[EdgeType.SUPPORTS].what == "Out"
+        assert others[EdgeType.SUPPORTS].tags == ["far"]
+        assert others[EdgeType.LED_TO].id == into
+        assert others[EdgeType.RELATES_TO].id == hub  # Self-loop points back at the node
+        edge = next(e for e, _ in pairs if e.type is EdgeType.SUPPORTS)
+        assert edge.metadata == {"k": 1}
+        assert storage.get_edges_with_endpoints(out)[0][1].id == hub
+    
     def test_query_by_time(self, storage):
         now = datetime.now(timezone.utc).replace(tzinfo=None)
         
@@ -144,6 +316,188 @@ class TestSQLiteBackend:
         assert len(results) == 1
         assert results[0].what == "Both"
     
+    def test_empty_tag_list_matches_nothing(self, storage):
+        storage.add_node(MemoryNode(what="Tagged", tags=["design"]))
+        
+        assert storage.query_by_tags([]) == []
+        # No tag filter at all is still "every node"
+        assert [n.what for n in storage.query_nodes(tags=None)] == ["Tagged"]
+    
+    def test_tag_index_follows_updates_and_deletes(self, storage):
+        node = MemoryNode(what="Retagged", tags=["old"])
+        storage.add_node(node)
+        
+        node.tags = ["new"]
+        storage.update_node(node)
+        assert storage.query_by_tags(["old"]) == []
+        assert [n.what for n in storage.query_by_tags(["new"])] == ["Retagged"]
+        
+        storage.delete_node(node.id)
+        assert storage.query_by_tags(["new"]) == []
+    
+    def test_tag_index_backfilled_on_upgrade(self, tmp_path):
+        db_path = str(tmp_path / "upgrade.db")
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        backend.add_node(MemoryNode(what="Pre-index", tags=["legacy"]))
+        
+        # Simulate a database written before the tag index existed
+        backend.conn.execute("DELETE FROM node_tags")
+        backend.conn.execute("PRAGMA user_version = 2")
+        backend.conn.commit()
+        backend.close()
+        
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        assert [n.what for n in backend.query_by_tags(["legacy"])] == ["Pre-index"]
+        backend.close()
+    
+    def test_query_by_tags_since(self, storage):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        for days in (1, 3, 10, 20):
+            storage.add_node(MemoryNode(
+                what=f"{days} days ago", tags=["api"], when=now - timedelta(days=days)
+            ))
+        
+        # Old matches don't crowd out recent ones under the limit
+        results = storage.query_by_tags(["api"], since=now - timedelta(days=7), limit=5)
+        assert [n.what for n in results] == ["1 days ago", "3 days ago"]
+    
+    def test_single_tag_query_walks_index_without_sorting(self, storage):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        types = {1: NodeType.TASK, 2: NodeType.EVENT, 3: NodeType.TASK, 4: NodeType.TASK}
+        for days, node_type in types.items():
+            storage.add_node(MemoryNode(
+                what=f"{days} days ago", type=node_type, tags=["api"],
+                when=now - timedelta(days=days),
+            ))
+        
+        statements = []
+        storage.conn.set_trace_callback(statements.append)
+        results = storage.query_nodes(
+            node_type=NodeType.TASK, tags=["api", "api"], until=now - timedelta(hours=36), limit=1
+        )
+        storage.conn.set_trace_callback(None)
+        
+        assert [n.what for n in results] == ["3 days ago"]
+        # The trace callback sees the statement with its parameters bound
+        details = [row["detail"] for row in storage.conn.execute("EXPLAIN QUERY PLAN " + statements[-1])]
+        assert any("idx_node_tags_when" in d for d in details)
+        assert not any("TEMP B-TREE" in d for d in details)
+    
+    def test_text_index_built_on_upgrade(self, tmp_path):
+        db_path = str(tmp_path / "pre_fts.db")
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        backend.add_node(MemoryNode(what="Self-hosted runner outage"))
+        
+        # Simulate a database written before full-text search existed
+        backend.conn.executescript("""
+            DROP TRIGGER nodes_ai;
+            DROP TRIGGER nodes_ad;
+            DROP TRIGGER nodes_au;
+            DROP TABLE nodes_fts;
+            PRAGMA user_version = 0;
+        """)
+        backend.close()
+        
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        assert [n.what for n in backend.query_by_text("outage")] == ["Self-hosted runner outage"]
+        assert len(backend.query_by_text("self-hosted")) == 1
+        backend.close()
+    
+    def test_query_nodes_combined_filters(self, storage):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        storage.add_node(MemoryNode(
+            what="Old task", type=NodeType.TASK, tags=["api"], when=now - timedelta(days=10)
+        ))
+        storage.add_node(MemoryNode(
+            what="Recent task", type=NodeType.TASK, tags=["api"], when=now - timedelta(hours=1)
+        ))
+        storage.add_node(MemoryNode(
+            what="Recent event", type=NodeType.EVENT, tags=["api"], when=now
+        ))
+        storage.add_node(MemoryNode(
+            what="Other task", type=NodeType.TASK, tags=["ui"], when=now
+        ))
+        
+        results = storage.query_nodes(
+            node_type=NodeType.TASK,
+            tags=["api"],
+            since=now - timedelta(days=1),
+        )
+        assert [r.what for r in results] == ["Recent task"]
+        
+        # Newest first
+        results = storage.query_nodes(node_type=NodeType.TASK)
+        assert results[-1].what == "Old task"
+    
+    def test_iter_nodes_and_count_nodes(self, storage):
+        now = datetime.now()
+        for days in (3, 2, 1):
+            storage.add_node(MemoryNode(what=f"{days} days ago", when=now - timedelta(days=days)))
+        
+        assert [n.what for n in storage.iter_nodes()] == ["1 days ago", "2 days ago", "3 days ago"]
+        assert [n.what for n in storage.iter_nodes(limit=1)] == ["1 days ago"]
+        since = now - timedelta(days=2, hours=1)
+        assert [n.what for n in storage.iter_nodes(since=since)] == ["1 days ago", "2 days ago"]
+        
+        assert storage.count_nodes() == 3
+        assert storage.count_nodes(since=since) == 2
+    
+    def test_iter_export_rows(self, storage):
+        node = MemoryNode(
+            what="Shipped",
+            when=datetime(2026, 2, 10, 9, 30, 45),
+            who=["Josh", "River"],
+            tags=["release", "v2"],
+        )
+        storage.add_node(node)
+        storage.add_node(MemoryNode(what="Bare", when=datetime(2026, 2, 9)))
+        
+        first, second = storage.iter_export_rows()
+        
+        assert first["id"] == str(node.id)
+        assert first["when_min"] == "2026-02-10 09:30"
+        assert first["tags_csv"] == "release, v2"
+        assert first["who_csv"] == "Josh, River"
+        assert second["tags_csv"] is None
+        assert second["who_csv"] is None
+        assert [r["what"] for r in storage.iter_export_rows(limit=1)] == ["Shipped"]
+    
+    def test_get_graph_stats(self, storage):
+        now = datetime.now()
+        hub = storage.add_node(MemoryNode(what="Hub", type=NodeType.DECISION, when=now))
+        a = storage.add_node(MemoryNode(what="A", when=now - timedelta(days=2)))
+        b = storage.add_node(MemoryNode(what="B", when=now - timedelta(days=1)))
+        storage.add_edge(Edge(source_id=hub, target_id=a, type=EdgeType.LED_TO))
+        storage.add_edge(Edge(source_id=b, target_id=hub, type=EdgeType.LED_TO))
+        storage.add_edge(Edge(source_id=hub, target_id=b, type=EdgeType.RELATES_TO))
+        
+        stats = storage.get_graph_stats(top_n=1)
+        
+        assert stats['node_count'] == 3
+        assert stats['node_types'] == {"decision": 1, "event": 2}
+        # Each edge is counted once, not once per endpoint
+        assert stats['edge_types'] == {"led_to": 2, "relates_to": 1}
+        assert stats['min_date'] == now - timedelta(days=2)
+        assert stats['max_date'] == now
+        assert stats['most_connected'] == [(hub, 3)]
+        
+        # Degrees sum both endpoints' counts; a self-loop counts at each end
+        storage.add_edge(Edge(source_id=a, target_id=a, type=EdgeType.RELATES_TO))
+        storage.add_edge(Edge(source_id=b, target_id=a, type=EdgeType.SUPPORTS))
+        assert dict(storage.get_graph_stats(top_n=3)['most_connected']) == {hub: 3, a: 4, b: 3}
+    
+    def test_get_graph_stats_empty(self, storage):
+        stats = storage.get_graph_stats()
+        
+        assert stats['node_count'] == 0
+        assert stats['min_date'] is None
+        assert stats['most_connected'] == []
+    
     def test_query_by_text(self, storage):
         storage.add_node(MemoryNode(what="Created the pitbull logo"))
         storage.add_node(MemoryNode(what="Fixed a bug in the API"))
@@ -156,6 +510,13 @@ class TestSQLiteBackend:
         assert "Created the pitbull logo" in whats
         assert "Updated the logo colors" in whats
     
+    def test_query_by_text_ranks_by_relevance(self, storage):
+        storage.add_node(MemoryNode(what="Mentioned the logo once among many other unrelated words"))
+        storage.add_node(MemoryNode(what="Logo logo logo", why="logo redesign"))
+        
+        results = storage.query_by_text("logo")
+        assert results[0].what == "Logo logo logo"
+    
     def test_query_by_text_hyphenated_words(self, storage):
         """Test FTS with hyphenated words like 'self-hosted'."""
         storage.add_node(MemoryNode(what="Explored self-hosted AI options"))
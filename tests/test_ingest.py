@@ -3,12 +3,13 @@
 import os
 import pytest
 import subprocess
+import sys
 import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 from uuid import UUID
 
-from engram.core import SQLiteBackend, MemoryNode, NodeType
+from engram.core import SQLiteBackend, MemoryNode, EdgeType, NodeType
 from engram.ingest import (
     import_git_repo,
     CommitFilter,
@@ -17,12 +18,18 @@ from engram.ingest import (
     content_hash,
     check_duplicate,
 )
-from engram.ingest.dedup import add_node_with_dedup
+from engram.ingest.dedup import (
+    add_node_with_dedup,
+    add_nodes_with_dedup,
+    fetch_content_hashes,
+)
 from engram.ingest.git import (
+    iter_git_log,
     parse_git_log,
     is_significant,
     commit_to_node,
     GitCommit,
+    _iter_log_records,
 )
 from engram.ingest.markdown import (
     extract_date_from_filename,
@@ -163,6 +170,11 @@ class TestContentHash:
     def test_hash_length(self):
         h = content_hash("Test content")
         assert len(h) == 16  # Truncated SHA256
+    
+    def test_hash_is_stable(self):
+        # Stored hashes must keep matching re-imports, so the algorithm is fixed
+        h = content_hash("Fix login bug", "2024-01-15 10:00:00", "git:abc123")
+        assert h == "ba9930f95c538256"
 
 
 class TestCheckDuplicate:
@@ -182,6 +194,34 @@ class TestCheckDuplicate:
         result = check_duplicate(temp_db, "abc123")
         assert result == node_id
     
+    def test_duplicate_check_uses_hash_index(self, temp_db):
+        from engram.ingest.dedup import _SELECT_BY_HASH_SQL
+        plan = temp_db.conn.execute(
+            "EXPLAIN QUERY PLAN " + _SELECT_BY_HASH_SQL, ("abc123",)
+        ).fetchall()
+        assert "USING INDEX idx_nodes_content_hash" in plan[0]["detail"]
+    
+    def test_hash_index_added_on_upgrade(self, tmp_path):
+        db_path = str(tmp_path / "v4.db")
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        node_id = backend.add_node(MemoryNode(what="Old import", source="md:a.md hash:abc123"))
+        
+        # Simulate a database written before the hash index existed
+        backend.conn.execute("DROP INDEX idx_nodes_content_hash")
+        backend.conn.execute("PRAGMA user_version = 4")
+        backend.conn.commit()
+        backend.close()
+        
+        backend = SQLiteBackend(db_path)
+        backend.initialize()
+        assert check_duplicate(backend, "abc123") == node_id
+        assert check_duplicate(backend, "abc") is None
+        assert backend.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_nodes_content_hash'"
+        ).fetchone() is not None
+        backend.close()
+    
     def test_add_node_with_dedup_new(self, temp_db):
         node = MemoryNode(what="New memory")
         node_id, was_new = add_node_with_dedup(temp_db, node, "newHash123")
@@ -199,6 +239,40 @@ class TestCheckDuplicate:
         assert was_new1 is True
         assert was_new2 is False
         assert node_id1 == node_id2
+    
+    def test_add_nodes_with_dedup_batches(self, temp_db, monkeypatch):
+        import engram.ingest.dedup as dedup
+        monkeypatch.setattr(dedup, "IMPORT_BATCH_SIZE", 2)
+        
+        existing = MemoryNode(what="Stored")
+        add_node_with_dedup(temp_db, existing, "h0")
+        
+        nodes = [MemoryNode(what=f"Memory {i}") for i in range(5)]
+        results = add_nodes_with_dedup(
+            temp_db, nodes, ["h1", "h2", "h1", "h0", "h3"]
+        )
+        
+        assert [was_new for _, was_new in results] == [True, True, False, False, True]
+        assert results[2][0] == nodes[0].id  # Repeat within the batch
+        assert results[3][0] == existing.id  # Already in storage
+        assert temp_db.count_nodes() == 4
+        assert check_duplicate(temp_db, "h3") == nodes[4].id
+    
+    def test_fetch_content_hashes(self, temp_db):
+        hashed = MemoryNode(what="Imported", source="md:notes.md")
+        add_node_with_dedup(temp_db, hashed, "abc123")
+        temp_db.add_node(MemoryNode(what="Manual", source="cli"))
+        
+        assert fetch_content_hashes(temp_db) == {"abc123": hashed.id}
+    
+    def test_add_nodes_with_dedup_updates_known_hashes(self, temp_db):
+        known = fetch_content_hashes(temp_db)
+        node = MemoryNode(what="First")
+        add_nodes_with_dedup(temp_db, [node], ["h1"], known)
+        
+        # A later call sharing the prefetch sees the earlier node
+        results = add_nodes_with_dedup(temp_db, [MemoryNode(what="Again")], ["h1"], known)
+        assert results == [(node.id, False)]
 
 
 class TestGitCommitFilter:
@@ -215,6 +289,32 @@ class TestGitCommitFilter:
         filter_config = CommitFilter(skip_merge=True)
         assert is_significant(commit, filter_config) is False
     
+    def test_trivial_patterns_edited_after_creation(self):
+        commit = GitCommit(
+            hash="abc123",
+            author="Test",
+            date=datetime.now(),
+            message="docs: typo",
+            files=[],
+        )
+        filter_config = CommitFilter()
+        assert is_significant(commit, filter_config) is True
+        
+        # Compiled patterns follow the list's current contents
+        filter_config.trivial_patterns.append(r"^DOCS: typo")
+        assert is_significant(commit, filter_config) is False
+    
+    def test_empty_trivial_patterns_skip_nothing(self):
+        commit = GitCommit(
+            hash="abc123",
+            author="Test",
+            date=datetime.now(),
+            message="WIP",
+            files=[],
+        )
+        filter_config = CommitFilter(trivial_patterns=[])
+        assert is_significant(commit, filter_config) is True
+    
     def test_include_feat_commits(self):
         commit = GitCommit(
             hash="abc123",
@@ -307,6 +407,21 @@ class TestCommitToNode:
         assert node.type == NodeType.EVENT
         assert "csharp" in node.tags
     
+    def test_file_type_tags(self):
+        commit = GitCommit(
+            hash="abc123",
+            author="Test",
+            date=datetime.now(),
+            message="docs: Refresh guides",
+            files=["README.md", "app/Main.csproj", "web/app.ts", "ci.yaml", "tests/data.json", "LICENSE"],
+        )
+        
+        node = commit_to_node(commit, "engram")
+        
+        assert node.type == NodeType.ARTIFACT
+        # First-seen order, with "docs" from the commit type not repeated
+        assert node.tags == ["engram", "docs", "csharp", "javascript", "ci", "testing"]
+    
     def test_how_field_populated(self):
         commit = GitCommit(
             hash="abc123",
@@ -351,6 +466,16 @@ class TestImportGitRepo:
         
         assert stats["nodes_created"] <= 2
     
+    def test_max_commits_keeps_newest_significant(self, temp_db, temp_git_repo):
+        stats = import_git_repo(temp_db, temp_git_repo, filter_config=CommitFilter(max_commits=2))
+        
+        # The WIP commit between them is skipped without using up the limit
+        assert stats["significant_commits"] == 2
+        assert sorted(n.what for n in temp_db.query_by_time(limit=10)) == [
+            "feat: Add dashboard component",
+            "test: Add integration tests",
+        ]
+    
     def test_import_creates_edges(self, temp_db, temp_git_repo):
         stats = import_git_repo(
             temp_db,
@@ -358,8 +483,48 @@ class TestImportGitRepo:
             link_related=True,
         )
         
-        # Should have edges for commits touching same files
-        assert stats["edges_created"] >= 0
+        # The two commits touching src/auth.py are linked, newest to oldest
+        assert stats["edges_created"] == 1
+        fix = temp_db.query_by_text("login")[0]
+        edges = temp_db.get_edges(fix.id, direction="outgoing")
+        assert [e.type for e in edges] == [EdgeType.PRECEDED_BY]
+        assert edges[0].metadata == {"shared_file": "src/auth.py"}
+        assert temp_db.get_node(edges[0].target_id).what == "feat: Add user authentication"
+    
+    def test_import_chains_commits_per_file(self, temp_db, temp_git_repo):
+        for i in range(4):
+            (temp_git_repo / "src" / "auth.py").write_text(f"version = {i}")
+            subprocess.run(
+                ["git", "commit", "-qam", f"fix: Auth change {i}"],
+                cwd=temp_git_repo, check=True, capture_output=True,
+            )
+        
+        stats = import_git_repo(temp_db, temp_git_repo, link_related=True)
+        
+        # Six commits touch src/auth.py: a chain of five, not all fifteen pairs
+        assert stats["edges_created"] == 5
+    
+    def test_import_writes_in_one_transaction(self, temp_db, temp_git_repo, monkeypatch):
+        def single_edge_insert(self, edge):
+            raise AssertionError("edges should be inserted in bulk")
+        
+        monkeypatch.setattr(SQLiteBackend, "add_edge", single_edge_insert)
+        commits = []
+        temp_db.conn.set_trace_callback(
+            lambda sql: commits.append(sql) if sql.upper().startswith("COMMIT") else None
+        )
+        
+        stats = import_git_repo(temp_db, temp_git_repo, link_related=True)
+        temp_db.conn.set_trace_callback(None)
+        
+        assert stats["nodes_created"] > 0 and stats["edges_created"] > 0
+        assert len(commits) == 1
+    
+    def test_parse_git_log_reads_files(self, temp_git_repo):
+        commits = parse_git_log(temp_git_repo, CommitFilter())
+        
+        fix = next(c for c in commits if c.message == "fix: Resolve login bug")
+        assert sorted(fix.files) == ["src/auth.py", "tests/test_auth.py"]
     
     def test_import_dry_run(self, temp_db, temp_git_repo):
         stats = import_git_repo(
@@ -371,6 +536,94 @@ class TestImportGitRepo:
         assert stats["total_commits"] > 0
         assert stats["nodes_created"] == 0  # Dry run doesn't create
     
+    @pytest.mark.parametrize("max_commits", [0, 2])
+    def test_dry_run_counts_match_import(self, temp_db, temp_git_repo, max_commits):
+        dry = import_git_repo(
+            temp_db,
+            temp_git_repo,
+            filter_config=CommitFilter(max_commits=max_commits),
+            dry_run=True,
+        )
+        real = import_git_repo(
+            temp_db,
+            temp_git_repo,
+            filter_config=CommitFilter(max_commits=max_commits),
+        )
+        
+        assert dry["total_commits"] == real["total_commits"]
+        assert dry["significant_commits"] == real["significant_commits"]
+        assert dry["edges_created"] == 0
+    
+    def test_skip_merge_drops_true_merges(self, temp_git_repo):
+        def git(*args):
+            subprocess.run(["git", *args], cwd=temp_git_repo, check=True, capture_output=True)
+        
+        # A real two-parent merge whose subject doesn't start with "Merge"
+        git("checkout", "-q", "-b", "side", "HEAD~1")
+        (temp_git_repo / "side.py").write_text("side = 1")
+        git("add", "side.py")
+        git("commit", "-q", "-m", "feat: Side change")
+        git("checkout", "-q", "-")
+        git("merge", "-q", "--no-ff", "-m", "Integrate side work", "side")
+        
+        kept = [c.message for c in iter_git_log(temp_git_repo, CommitFilter())]
+        everything = [c.message for c in iter_git_log(temp_git_repo, CommitFilter(skip_merge=False))]
+        
+        assert "feat: Side change" in kept
+        assert "Integrate side work" not in kept
+        assert "Integrate side work" in everything
+    
+    def test_iter_git_log_streams_commits(self, temp_git_repo):
+        commits = iter_git_log(temp_git_repo, CommitFilter())
+        
+        first = next(commits)
+        assert first.message == "test: Add integration tests"
+        assert [first, *commits] == parse_git_log(temp_git_repo, CommitFilter())
+    
+    def test_iter_git_log_keeps_pipes_in_subjects(self, temp_git_repo):
+        (temp_git_repo / "src" / "auth.py").write_text("mode = 'a|b'")
+        subprocess.run(
+            ["git", "commit", "-qam", "fix: Accept a|b|c as auth mode"],
+            cwd=temp_git_repo, check=True, capture_output=True,
+        )
+        
+        commits = list(iter_git_log(temp_git_repo, CommitFilter()))
+        
+        assert commits[0].message == "fix: Accept a|b|c as auth mode"
+        assert commits[0].files == ["src/auth.py"]
+        assert commits[1].message == "test: Add integration tests"
+        assert commits[1].files == ["tests/test_integration.py"]
+    
+    def test_iter_git_log_tolerates_non_utf8_paths(self, temp_git_repo):
+        name = b"caf\xe9.txt"  # Latin-1, printed verbatim by git log -z
+        (temp_git_repo / os.fsdecode(name)).write_text("menu")
+        subprocess.run(["git", "add", "-A"], cwd=temp_git_repo, check=True, capture_output=True)
+        subprocess.run(
+            ["git", "commit", "-qm", "docs: Add menu"],
+            cwd=temp_git_repo, check=True, capture_output=True,
+        )
+        
+        newest = next(iter_git_log(temp_git_repo, CommitFilter()))
+        
+        assert newest.message == "docs: Add menu"
+        assert newest.files == ["caf\ufffd.txt"]
+    
+    def test_iter_git_log_raises_outside_repo(self, tmp_path):
+        with pytest.raises(subprocess.CalledProcessError) as excinfo:
+            list(iter_git_log(tmp_path, CommitFilter()))
+        assert "not a git repository" in excinfo.value.stderr
+    
+    def test_log_reader_survives_heavy_stderr(self):
+        # Far more warnings than a pipe buffer holds, written before any output
+        script = (
+            "import sys; sys.stderr.write('warning: x\\n' * 100000); sys.stderr.flush(); "
+            "sys.stdout.write('\\x1eabc\\x00Ann\\x002026-02-10T10:00:00\\x00fix: y\\x00')"
+        )
+        
+        records = list(_iter_log_records([sys.executable, "-c", script]))
+        
+        assert records == [["abc", "Ann", "2026-02-10T10:00:00", "fix: y"]]
+    
     def test_import_deduplication(self, temp_db, temp_git_repo):
         # Import twice
         stats1 = import_git_repo(temp_db, temp_git_repo)
@@ -437,6 +690,12 @@ class TestMarkdownNodeTypeInference:
     
     def test_infer_default_event(self):
         assert infer_node_type("Random Section", "Some content") == NodeType.EVENT
+    
+    def test_infer_first_matching_type_wins(self):
+        # Keywords match as substrings, and earlier types take priority
+        assert infer_node_type("Project decision", "...") == NodeType.DECISION
+        assert infer_node_type("Recalled tasks", "...") == NodeType.TASK
+        assert infer_node_type("Until Friday", "...") == NodeType.INSIGHT
 
 
 class TestMarkdownTagExtraction:
@@ -464,6 +723,13 @@ class TestMarkdownTagExtraction:
             "And #lots #of #hashtags #here #too #many #extra #more #tags #overflow"
         )
         assert len(tags) <= 10
+    
+    def test_header_words_split_on_punctuation(self):
+        assert extract_tags("Fix: auth-flow (v2)", "Nothing notable") == ["fix", "auth", "flow"]
+    
+    def test_tags_keep_first_seen_order(self):
+        tags = extract_tags("Deploy Notes", "Working on #api and #deploy, fixed a bug")
+        assert tags == ["deploy", "notes", "api", "bug"]
 
 
 class TestMarkdownPeopleExtraction:
@@ -530,6 +796,24 @@ Hello
         
         assert len(sections) == 1
         assert sections[0][0] == "With Content"
+    
+    def test_header_must_start_line(self):
+        content = """Preamble ## not a header
+
+## Real Header
+Body mentions ## inline
+"""
+        sections = parse_markdown_sections(content)
+        
+        assert sections == [("Real Header", "Body mentions ## inline")]
+    
+    def test_header_on_first_line_and_header_only_sections(self):
+        content = "## First\nBody one\n## Header only\n##   Spaced  \n\n  Body two  \n"
+        
+        assert parse_markdown_sections(content) == [
+            ("First", "Body one"),
+            ("Spaced", "Body two"),
+        ]
 
 
 class TestImportMarkdownFile:
@@ -604,11 +888,58 @@ class TestImportMarkdownDir:
         # Should have edges linking nodes from same date
         assert stats["edges_created"] >= 0
     
+    def test_import_writes_in_one_transaction(self, temp_db, temp_md_dir):
+        commits = []
+        temp_db.conn.set_trace_callback(
+            lambda sql: commits.append(sql) if sql.upper().startswith("COMMIT") else None
+        )
+        
+        stats = import_markdown_dir(temp_db, temp_md_dir, link_by_date=True)
+        temp_db.conn.set_trace_callback(None)
+        
+        assert stats["nodes_created"] > 0 and stats["edges_created"] > 0
+        assert len(commits) == 1
+    
+    def test_repeats_within_import_skip_database_checks(self, temp_db, tmp_path):
+        md_dir = tmp_path / "repeats"
+        md_dir.mkdir()
+        (md_dir / "2026-02-10.md").write_text("## Standup\n\nSame notes.\n\n" * 3)
+        hash_queries = []
+        
+        def track_hash_queries(sql):
+            if sql.lstrip().upper().startswith("SELECT") and "'hash:'" in sql:
+                hash_queries.append(sql)
+        
+        temp_db.conn.set_trace_callback(track_hash_queries)
+        
+        stats = import_markdown_dir(temp_db, md_dir)
+        temp_db.conn.set_trace_callback(None)
+        
+        assert stats["nodes_created"] == 1
+        assert stats["nodes_skipped"] == 2
+        assert len(hash_queries) == 1  # The one prefetch, not a lookup per section
+    
     def test_import_dry_run(self, temp_db, temp_md_dir):
         stats = import_markdown_dir(temp_db, temp_md_dir, dry_run=True)
         
         assert stats["files_processed"] == 3
         assert stats["nodes_created"] == 0
+    
+    def test_date_edges_link_imported_sections(self, temp_db, temp_md_dir):
+        stats = import_markdown_dir(temp_db, temp_md_dir, pattern="2026-02-10.md")
+        
+        # Three sections from one date form a chain of two edges
+        assert stats["nodes_created"] == 3
+        assert stats["edges_created"] == 2
+    
+    def test_date_edges_ignore_other_recent_nodes(self, temp_db, temp_md_dir):
+        # Newer than anything imported, so a "most recent N nodes" lookup would pick it up
+        unrelated = temp_db.add_node(MemoryNode(what="Unrelated", when=datetime(2030, 1, 1)))
+        
+        stats = import_markdown_dir(temp_db, temp_md_dir, pattern="2026-02-10.md")
+        
+        assert stats["edges_created"] == 2
+        assert temp_db.get_edges(unrelated) == []
 
 
 class TestCLIImportGit:
@@ -161,6 +161,60 @@ class TestTraversal:
         
         # Should find all 7 nodes
         assert len(results) == 7
+    
+    def test_traverse_multi_source(self, traverser, logo_graph):
+        results = traverser.traverse_bfs_multi(
+            [logo_graph['request'].id, logo_graph['deploy'].id],
+            max_hops=1,
+            include_start=False,
+        )
+        
+        # One hop from either end: v1 and decision, each reached from its nearest seed
+        by_what = {r.node.what: r for r in results}
+        assert len(results) == 2
+        assert by_what["First logo draft - cartoon pitbull"].path == [
+            logo_graph['request'].id, logo_graph['v1'].id
+        ]
+        assert by_what["Chose line art version (v2)"].hop_count == 1
+    
+    def test_traverse_multi_source_shares_visited(self, traverser, logo_graph):
+        results = traverser.traverse_bfs_multi(
+            [logo_graph['v2'].id, logo_graph['v3'].id],
+            max_hops=2,
+            include_start=True,
+        )
+        
+        # Overlapping neighborhoods are only reported once
+        ids = [r.node.id for r in results]
+        assert len(ids) == len(set(ids))
+        assert len(results) == 6  # everything except request (3 hops away)
+    
+    def test_traverse_multi_source_one_lookup_per_hop(self, storage, traverser, logo_graph, monkeypatch):
+        calls = []
+        real_get_neighbors = storage.get_neighbors
+        
+        def counting_get_neighbors(frontier, *args, **kwargs):
+            calls.append(list(frontier))
+            return real_get_neighbors(frontier, *args, **kwargs)
+        
+        monkeypatch.setattr(storage, "get_neighbors", counting_get_neighbors)
+        seeds = [node.id for node in logo_graph.values()]
+        
+        traverser.traverse_bfs_multi(seeds, max_hops=3)
+        
+        # Every seed expands in the first lookup; later hops have nothing new
+        assert len(calls) == 1
+        assert len(calls[0]) == len(seeds)
+    
+    def test_traverse_ids_only(self, traverser, logo_graph):
+        ids = list(traverser.traverse_bfs_ids([logo_graph['feedback'].id], max_hops=1))
+        
+        assert set(ids) == {logo_graph[k].id for k in ('v1', 'v2', 'v3')}
+        
+        # Matches the full traversal, without building QueryResults
+        full = traverser.traverse_bfs(logo_graph['request'].id, max_hops=3, include_start=False)
+        ids = traverser.traverse_bfs_ids([logo_graph['request'].id], max_hops=3)
+        assert set(ids) == {r.node.id for r in full}
 
 
 class TestFindPath:
@@ -200,6 +254,33 @@ class TestFindPath:
         
         assert path is None
 
+    def test_find_path_is_shortest(self, traverser, logo_graph):
+        # Edges are followed both ways; deploy reaches feedback through v2 or v3
+        for start, end, length in [('v3', 'v1', 3), ('deploy', 'feedback', 4), ('v2', 'v2', 1)]:
+            path = traverser.find_path(logo_graph[start].id, logo_graph[end].id)
+            
+            assert path is not None
+            assert len(path) == length
+            assert path[0].id == logo_graph[start].id
+            assert path[-1].id == logo_graph[end].id
+    
+    def test_bidirectional_respects_max_hops(self, traverser, logo_graph):
+        # request -> deploy needs 5 hops
+        assert traverser.find_path_bidir(
+            logo_graph['request'].id, logo_graph['deploy'].id, max_hops=4
+        ) is None
+        assert traverser.find_path_bidir(
+            logo_graph['request'].id, logo_graph['deploy'].id, max_hops=5
+        ) is not None
+    
+    def test_bidirectional_no_path(self, storage, traverser):
+        n1 = MemoryNode(what="Island 1")
+        n2 = MemoryNode(what="Island 2")
+        storage.add_node(n1)
+        storage.add_node(n2)
+        
+        assert traverser.find_path_bidir(n1.id, n2.id) is None
+
 
 class TestFindRelated:
     """Tests for relationship queries."""
@@ -226,6 +307,17 @@ class TestFindRelated:
         
         # Feedback led to v2 and v3
         assert len(related) == 2
+    
+    def test_find_related_both_directions(self, traverser, logo_graph):
+        related = traverser.find_related(
+            logo_graph['feedback'].id,
+            EdgeType.LED_TO,
+            direction="both",
+        )
+        
+        # v1 led to feedback, which led to v2 and v3 - each reported once
+        assert {n.id for n in related} == {logo_graph[k].id for k in ('v1', 'v2', 'v3')}
+        assert len(related) == 3
 
 
 class TestContextWindow: